@@ -1,13 +1,19 @@
-
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from data_collector import ReviewCollector
+from data_collector import ReviewCollector, RECENT_REVIEWS_URL
+from dedup import ReviewDeduplicator
 from preprocessor import TextPreprocessor
 from sentiment_analyzer import SentimentAnalyzer
+from sentiment_cache import SentimentCache
+from resources import registry
+from instrumentation import metrics
+from review_store import ReviewStore
+from rollups import SentimentRollup
 import requests
 import sys
-from visualizer import SentimentVisualizer
+import threading
+import time
+from visualizer import SentimentVisualizer, WordCloudEngine
 import re
 
 class Config:
@@ -16,8 +22,17 @@ class Config:
         'negative': 'red',
         'neutral': 'blue'
     }
+    CONNECTIVITY_URL = "http://www.google.com"
+    CONNECTIVITY_TTL = 60
     MAX_PAGES_LIMIT = 10
     DEFAULT_PAGES = 5
+    STREAM_CHUNK_SIZE = 100
+    MODEL_OPTIONS = {
+        "VADER (Fast)": "vader",
+        "BERT (Accurate)": "bert",
+        "BERT int8 (CPU)": "bert-int8",
+        "BERT ONNX (CPU)": "bert-onnx"
+    }
 
 def set_page_config():
     st.set_page_config(
@@ -34,8 +49,9 @@ def sidebar_config():
         
         model_type = st.selectbox(
             "Select Model",
-            ["VADER (Fast)", "BERT (Accurate)"],
-            help="VADER is faster but BERT might be more accurate"
+            list(Config.MODEL_OPTIONS),
+            help="VADER is faster but BERT might be more accurate. The int8 and ONNX "
+                 "BERT variants run faster on CPU from a local model directory."
         )
         
         st.divider()
@@ -48,7 +64,7 @@ def sidebar_config():
         - 📈 View detailed visualizations
         """)
         
-        return "vader" if "VADER" in model_type else "bert"
+        return Config.MODEL_OPTIONS[model_type]
 
 def display_header():
     col1, col2 = st.columns([3, 1])
@@ -56,12 +72,15 @@ def display_header():
         st.title("📊 E-commerce Sentiment Analysis")
         st.markdown("Analyze product reviews and understand customer sentiment")
     with col2:
-        if not check_internet_connection():
+        connected = get_connectivity_probe().status()
+        if connected is None:
+            st.info("⏳ Checking connection...")
+        elif not connected:
             st.error("⚠️ No Internet Connection")
         else:
             st.success("✅ Connected")
 
-def single_review_analysis(preprocessor, analyzer):
+def single_review_analysis(model_type):
     with st.expander("Review Analysis Options", expanded=True):
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -82,6 +101,8 @@ def single_review_analysis(preprocessor, analyzer):
                 st.warning("⚠️ Please enter a review text")
             else:
                 with st.spinner("🔄 Analyzing..."):
+                    preprocessor = get_preprocessor()
+                    analyzer = get_analyzer(model_type)
                     # Show preprocessing if selected
                     if show_preprocessing:
                         with st.expander("Preprocessing Steps", expanded=True):
@@ -108,7 +129,7 @@ def single_review_analysis(preprocessor, analyzer):
                             for score_type, value in result['scores'].items():
                                 st.metric(score_type.title(), f"{value:.2f}")
 
-def amazon_product_analysis(collector, preprocessor, analyzer, visualizer):
+def amazon_product_analysis(collector, model_type, visualizer, store):
     with st.expander("Amazon Product Analysis", expanded=True):
         col1, col2 = st.columns([2, 1])
         with col1:
@@ -133,96 +154,332 @@ def amazon_product_analysis(collector, preprocessor, analyzer, visualizer):
             else:
                 with st.spinner("🔄 Fetching and analyzing reviews..."):
                     try:
-                        reviews_df = collector.get_amazon_reviews(product_id, max_pages)
-                        
-                        if reviews_df.empty:
+                        tabs, analysis = run_product_analysis(
+                            collector, get_preprocessor(), get_analyzer(model_type), visualizer, store,
+                            product_id, max_pages
+                        )
+                        if analysis is None:
                             st.error("No reviews found for this product ID")
                             return
-                        
-                        # Progress bar for analysis
-                        progress_bar = st.progress(0)
-                        reviews_df = analyze_reviews(reviews_df, preprocessor, analyzer)
-                        progress_bar.progress(100)
-                        
-                        # Display results in tabs
-                        tab1, tab2, tab3, tab4 = st.tabs([
-                            "📊 Overview",
-                            "📈 Trends",
-                            "☁️ Word Clouds",
-                            "🔍 Details"
-                        ])
-                        
-                        with tab1:
-                            col1, col2 = st.columns([2, 1])
-                            with col1:
-                                st.plotly_chart(
-                                    visualizer.sentiment_distribution(reviews_df),
-                                    use_container_width=True
-                                )
-                            with col2:
-                                st.markdown("### Summary Statistics")
-                                counts = reviews_df['sentiment'].value_counts()
-                                total = len(reviews_df)
-                                for sent, count in counts.items():
-                                    st.metric(
-                                        sent.title(),
-                                        f"{count} reviews",
-                                        f"{count/total*100:.1f}%"
-                                    )
-                        
-                        with tab2:
-                            st.plotly_chart(
-                                visualizer.plot_sentiment_trends(reviews_df),
-                                use_container_width=True
-                            )
-                        
-                        with tab3:
-                            col1, col2 = st.columns([1, 3])
-                            with col1:
-                                sentiment_option = st.selectbox(
-                                    "Select Sentiment",
-                                    ["All", "Positive", "Negative", "Neutral"]
-                                )
-                            with col2:
-                                filtered_texts = reviews_df['review_text']
-                                if sentiment_option != "All":
-                                    filtered_texts = reviews_df[
-                                        reviews_df['sentiment'] == sentiment_option.lower()
-                                    ]['review_text']
-                                
-                                if not filtered_texts.empty:
-                                    st.pyplot(visualizer.create_wordcloud(filtered_texts))
-                                else:
-                                    st.warning(f"No {sentiment_option.lower()} reviews found")
-                        
-                        with tab4:
-                            st.dataframe(
-                                reviews_df[['review_text', 'sentiment', 'date']],
-                                use_container_width=True
-                            )
+                        st.session_state['product_analysis'] = analysis
+                        render_product_details(analysis, visualizer, tabs)
+                        if metrics.enabled:
+                            analysis['metrics'] = metrics.snapshot()
+                            with tabs[4]:
+                                render_performance(analysis['metrics'])
                     
                     except Exception as e:
                         st.error(f"Error during analysis: {str(e)}")
+        
+        elif 'product_analysis' in st.session_state:
+            # Widget changes rerun the script; redraw the last analysis from its rollups
+            analysis = st.session_state['product_analysis']
+            tabs = create_product_tabs()
+            with tabs[0]:
+                col1, col2 = st.columns([2, 1])
+                counts = analysis['rollup'].sentiment_counts()
+                with col1:
+                    st.plotly_chart(
+                        visualizer.sentiment_distribution_from_counts(counts),
+                        use_container_width=True
+                    )
+                with col2:
+                    st.markdown("### Summary Statistics")
+                    render_summary_metrics(counts, int(analysis['reviews']['is_duplicate'].sum()))
+            render_product_details(analysis, visualizer, tabs)
+            if metrics.enabled:
+                with tabs[4]:
+                    render_performance(analysis.get('metrics'))
+
+def create_product_tabs():
+    labels = [
+        "📊 Overview",
+        "📈 Trends",
+        "☁️ Word Clouds",
+        "🔍 Details"
+    ]
+    if metrics.enabled:
+        labels.append("⏱️ Performance")
+    return st.tabs(labels)
+
+def run_product_analysis(collector, preprocessor, analyzer, visualizer, store, product_id, max_pages):
+    """Fetch and score a product's reviews, refreshing the Overview tab after every chunk.
+
+    Returns the result tabs and the analysis (None when no reviews were found).
+    """
+    metrics.reset()
+    progress_bar = st.progress(0)
+    tabs = create_product_tabs()
+    
+    with tabs[0]:
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            chart_placeholder = st.empty()
+        with col2:
+            st.markdown("### Summary Statistics")
+            metrics_placeholder = st.empty()
+    
+    chunks = []
+    rollup = SentimentRollup()
+    wordclouds = WordCloudEngine()
+    dedup = ReviewDeduplicator()
+    
+    def add_chunk(chunk):
+        chunks.append(chunk)
+        # Charts count each duplicate cluster once
+        unique = chunk[~chunk['is_duplicate']]
+        rollup.add(unique, product_id)
+        wordclouds.add(unique['processed_text'], unique['sentiment'])
+        counts = rollup.sentiment_counts(product_id)
+        # An all-duplicate chunk leaves the chart as it was; redrawing an
+        # identical figure would collide with its auto-generated element ID.
+        if not unique.empty:
+            chart_placeholder.plotly_chart(
+                visualizer.sentiment_distribution_from_counts(counts),
+                use_container_width=True,
+                key=f"streamed_distribution_{len(chunks)}"
+            )
+        with metrics_placeholder.container():
+            render_summary_metrics(counts, sum(int(c['is_duplicate'].sum()) for c in chunks))
+    
+    # Reviews stored by earlier runs only need scoring for a new model
+    stored_df = load_stored_reviews(store, product_id, preprocessor, analyzer)
+    if not stored_df.empty:
+        add_chunk(add_duplicate_columns(
+            stored_df, dedup.score(
+                stored_df['processed_text'],
+                results=stored_df[['sentiment']],
+                identities=stored_df['review_hash']
+            )
+        ))
+    
+    pages = fetch_new_reviews(collector, store, product_id, max_pages)
+    for pages_done, chunk in stream_reviews(pages, preprocessor, analyzer, dedup):
+        progress_bar.progress(min(pages_done / max_pages, 1.0))
+        if chunk.empty:
+            continue
+        store.save_reviews(product_id, chunk, analyzer.model_key())
+        add_chunk(chunk)
+    progress_bar.progress(1.0)
+    
+    if not chunks:
+        return tabs, None
+    reviews_df = pd.concat(chunks, ignore_index=True)
+    reviews_df['duplicate_count'] = reviews_df.groupby('cluster')['cluster'].transform('size')
+    return tabs, {
+        'product_id': product_id,
+        'reviews': reviews_df,
+        'rollup': rollup,
+        'wordclouds': wordclouds
+    }
 
-def check_internet_connection():
+def render_product_details(analysis, visualizer, tabs):
+    """Render the Trends, Word Clouds and Details tabs of an analysis"""
+    _, tab2, tab3, tab4 = tabs[:4]
+    reviews_df = analysis['reviews']
+    rollup = analysis['rollup']
+    
+    with tab2:
+        granularity = st.radio(
+            "Granularity",
+            list(SentimentRollup.GRANULARITIES),
+            format_func=str.title,
+            horizontal=True
+        )
+        trend_table = rollup.trend_table(granularity)
+        if not trend_table.empty:
+            st.plotly_chart(
+                visualizer.plot_trend_table(trend_table, granularity),
+                use_container_width=True
+            )
+        category_table = rollup.category_table()
+        if len(category_table) > 1:
+            st.plotly_chart(
+                visualizer.category_chart(category_table),
+                use_container_width=True
+            )
+    
+    with tab3:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            sentiment_option = st.selectbox(
+                "Select Sentiment",
+                ["All", "Positive", "Negative", "Neutral"]
+            )
+        with col2:
+            sentiments = None if sentiment_option == "All" else [sentiment_option.lower()]
+            fig = analysis['wordclouds'].render(sentiments)
+            if fig is not None:
+                st.pyplot(fig)
+            else:
+                st.warning(f"No {sentiment_option.lower()} reviews found")
+    
+    with tab4:
+        st.dataframe(
+            reviews_df[['review_text', 'sentiment', 'date', 'duplicate_count']],
+            use_container_width=True
+        )
+
+def render_performance(snapshot):
+    """Per-stage breakdown of the last product analysis"""
+    if not snapshot or not snapshot['spans']:
+        st.info("Run an analysis with the performance panel enabled to see its breakdown")
+        return
+    stages = pd.DataFrame([
+        {
+            'stage': name,
+            'calls': stats['calls'],
+            'total_s': stats['total_s'],
+            'mean_ms': stats['total_s'] / stats['calls'] * 1000,
+            'max_ms': stats['max_s'] * 1000
+        }
+        for name, stats in snapshot['spans'].items()
+    ]).sort_values('total_s', ascending=False)
+    
+    st.markdown("### Time per Stage")
+    st.caption("Nested stages are included in their parents' totals")
+    st.bar_chart(stages.set_index('stage')['total_s'])
+    st.dataframe(stages, use_container_width=True, hide_index=True)
+    
+    st.markdown("### Counters")
+    st.dataframe(
+        pd.DataFrame(list(snapshot['counters'].items()), columns=['counter', 'value']),
+        use_container_width=True, hide_index=True
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download JSON", metrics.to_json(snapshot),
+                           file_name="metrics.json", mime="application/json")
+    with col2:
+        st.download_button("Download Prometheus", metrics.to_prometheus(snapshot),
+                           file_name="metrics.prom", mime="text/plain")
+
+def render_summary_metrics(counts, duplicates=0):
+    total = counts.sum()
+    for sent, count in counts.sort_values(ascending=False).items():
+        st.metric(
+            sent.title(),
+            f"{count} reviews",
+            f"{count/total*100:.1f}%"
+        )
+    if duplicates:
+        st.caption(f"{duplicates} duplicate reviews counted once")
+
+def check_internet_connection(url=Config.CONNECTIVITY_URL, timeout=3):
     try:
-        requests.get("http://www.google.com", timeout=3)
+        requests.get(url, timeout=timeout)
         return True
-    except requests.ConnectionError:
+    except requests.RequestException:
         return False
 
-def analyze_reviews(reviews_df, preprocessor, analyzer):
-    """Helper function to analyze reviews"""
-    processed_texts = reviews_df['review_text'].apply(preprocessor.preprocess)
-    sentiments = []
-    
-    for text in processed_texts:
-        result = analyzer.analyze_text(text)
-        sentiments.append(result['sentiment'])
+class ConnectivityProbe:
+    """Internet check that runs in a background thread at most once per `ttl` seconds.
+
+    Reruns read the last result instead of waiting on a request, so a slow
+    or unreachable network never delays rendering.
+    """
+
+    def __init__(self, url=Config.CONNECTIVITY_URL, ttl=Config.CONNECTIVITY_TTL, timeout=3):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connected = None
+        self._checked_at = None
+        self._checking = False
+
+    def status(self):
+        """True/False from the last check (None before the first one finishes), refreshed when stale"""
+        with self._lock:
+            stale = self._checked_at is None or time.monotonic() - self._checked_at >= self.ttl
+            if stale and not self._checking:
+                self._checking = True
+                threading.Thread(target=self._check, daemon=True).start()
+            return self._connected
+
+    def _check(self):
+        connected = check_internet_connection(self.url, self.timeout)
+        with self._lock:
+            self._connected = connected
+            self._checked_at = time.monotonic()
+            self._checking = False
+
+def analyze_reviews(reviews_df, preprocessor, analyzer, dedup=None):
+    """Helper function to analyze reviews.
+
+    With a ReviewDeduplicator only one review per duplicate cluster is
+    scored, and the cluster columns are added to the result. Reviews with
+    the same ReviewStore identity (text plus date) are merged however short
+    they are, which also merges identical same-day reviews from two
+    customers; the store keeps those as one review too.
+    """
+    processed_texts = preprocessor.preprocess_batch(reviews_df['review_text'])
+    reviews_df['processed_text'] = processed_texts.values
+    if dedup is not None:
+        identities = [ReviewStore.review_hash(review) for review in reviews_df.to_dict('records')]
+        return add_duplicate_columns(reviews_df, dedup.score(processed_texts, analyzer, identities=identities))
     
-    reviews_df['sentiment'] = sentiments
+    results = analyzer.analyze_batch(processed_texts)
+    reviews_df['sentiment'] = results['sentiment'].values
+    return reviews_df
+
+def add_duplicate_columns(reviews_df, results):
+    """Copy sentiment and duplicate cluster columns from ReviewDeduplicator.score"""
+    for column in ['sentiment', 'cluster', 'duplicate_count', 'is_duplicate']:
+        reviews_df[column] = results[column].values
     return reviews_df
 
+def load_stored_reviews(store, product_id, preprocessor, analyzer):
+    """Load a product's stored reviews, scoring any not yet scored by this model"""
+    stored_df = store.load_reviews(product_id, analyzer.model_key())
+    unscored = stored_df['sentiment'].isna()
+    if unscored.any():
+        pending = stored_df[unscored]
+        processed = pending['processed_text']
+        missing = processed.isna()
+        if missing.any():
+            processed = processed.copy()
+            processed[missing] = preprocessor.preprocess_batch(pending.loc[missing, 'review_text'])
+        results = analyzer.analyze_batch(processed)
+        stored_df.loc[unscored, 'processed_text'] = processed.values
+        stored_df.loc[unscored, 'sentiment'] = results['sentiment'].values
+        store.save_reviews(product_id, stored_df[unscored], analyzer.model_key())
+    return stored_df
+
+def fetch_new_reviews(collector, store, product_id, max_pages):
+    """Page through a product's reviews, yielding only those not in the store yet.
+
+    Stops at the first review we already have once the store reaches
+    `max_pages` deep; those products page sequentially so we don't
+    prefetch pages we'll discard. Shallower ones page through known
+    reviews to fill in the older pages.
+    """
+    known = store.known_hashes(product_id)
+    covered = bool(known) and store.covers_pages(product_id, max_pages)
+    return collector.iter_amazon_reviews(
+        product_id, max_pages, concurrent=not covered,
+        is_known=lambda review: store.review_hash(review) in known,
+        stop_at_known=covered,
+        on_complete=lambda pages, complete: store.save_crawl(product_id, pages, complete)
+    )
+
+def stream_reviews(pages, preprocessor, analyzer, dedup=None, chunk_size=Config.STREAM_CHUNK_SIZE):
+    """Analyze reviews from a page iterator in bounded chunks.
+
+    Yields (pages consumed, analyzed chunk) as soon as each chunk is scored, so
+    the UI can refresh without waiting for the remaining pages.
+    """
+    pages_done = 0
+    for page_reviews in pages:
+        pages_done += 1
+        if not page_reviews:
+            yield pages_done, pd.DataFrame()
+            continue
+        for start in range(0, len(page_reviews), chunk_size):
+            chunk = pd.DataFrame(page_reviews[start:start + chunk_size])
+            yield pages_done, analyze_reviews(chunk, preprocessor, analyzer, dedup)
+
 def validate_product_id(product_id):
     """Validate Amazon product ID format"""
     if not product_id:
@@ -230,30 +487,101 @@ def validate_product_id(product_id):
     # Basic format check for Amazon product IDs
     return bool(re.match(r'^[A-Z0-9]{10}$', product_id))
 
+@st.cache_resource
+def get_connectivity_probe():
+    return ConnectivityProbe()
+
+@st.cache_resource
+def get_sentiment_cache():
+    """Share one result cache across reruns and sessions"""
+    return SentimentCache()
+
+@st.cache_resource
+def get_collector():
+    return ReviewCollector(base_url=RECENT_REVIEWS_URL)
+
+@st.cache_resource
+def get_review_store():
+    return ReviewStore()
+
+@st.cache_resource
+def get_preprocessor():
+    preprocessor = TextPreprocessor()
+    preprocessor.warm_up()
+    return preprocessor
+
+def get_analyzer(model_type):
+    """Shared analyzer for `model_type`, or VADER with a warning when that model can't load"""
+    try:
+        return load_analyzer(model_type)
+    except RuntimeError as e:
+        st.warning(f"{e}. Using VADER instead; the model is retried on the next run.")
+        return load_analyzer("vader")
+
+@st.cache_resource
+def load_analyzer(model_type):
+    analyzer = SentimentAnalyzer(
+        model_type=model_type,
+        cache=get_sentiment_cache(),
+        preprocessing=TextPreprocessor.config_id
+    )
+    # SentimentAnalyzer falls back to VADER itself; raising keeps that
+    # fallback out of the cache, so later sessions try the model again.
+    if analyzer.model_type != model_type:
+        raise RuntimeError(f"Could not load the {model_type} model")
+    analyzer.warm_up()
+    return analyzer
+
+@st.cache_resource
+def get_visualizer():
+    return SentimentVisualizer()
+
+def performance_toggle():
+    # Metrics are process-wide, so this switches them for every session
+    metrics.enabled = st.sidebar.checkbox(
+        "Show performance panel",
+        value=metrics.enabled,
+        help="Time each stage of product analyses (adds a Performance tab)"
+    )
+
+def display_load_times(rerun_seconds):
+    with st.sidebar.expander("⏱️ Load Times"):
+        for name, seconds in registry.load_times.items():
+            st.text(f"{name}: {seconds:.2f}s")
+        st.text(f"last rerun: {rerun_seconds:.2f}s")
+
 def main():
+    started = time.perf_counter()
     set_page_config()
     model_type = sidebar_config()
+    performance_toggle()
     display_header()
     
     try:
-        # Initialize components
-        collector = ReviewCollector()
-        preprocessor = TextPreprocessor()
-        analyzer = SentimentAnalyzer(model_type=model_type)
-        visualizer = SentimentVisualizer()
+        # Components are built once per process and shared by every session
+        collector = get_collector()
+        visualizer = get_visualizer()
         
         # Main content area
         tab1, tab2 = st.tabs(["📝 Single Review", "🔍 Amazon Product"])
         
         with tab1:
-            single_review_analysis(preprocessor, analyzer)
+            single_review_analysis(model_type)
             
         with tab2:
-            amazon_product_analysis(collector, preprocessor, analyzer, visualizer)
+            amazon_product_analysis(collector, model_type, visualizer, get_review_store())
+        
+        # The page is drawn before the models load; warm them now so the
+        # first analysis doesn't wait (a no-op once they are cached)
+        with st.sidebar, st.spinner("Loading models..."):
+            get_preprocessor()
+            get_analyzer(model_type)
             
     except Exception as e:
         st.error(f"Application Error: {str(e)}")
         st.warning("Please try restarting the application")
+    
+    display_load_times(time.perf_counter() - started)
 
 if __name__ == "__main__":
     main()
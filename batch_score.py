@@ -0,0 +1,220 @@
+"""Score large CSV/Parquet review dumps without the Streamlit UI.
+
+    python batch_score.py reviews.csv scored/ --model vader --chunk-size 50000
+
+Results are written to the output directory as one Parquet part per input
+chunk, which together read back as a single dataset with
+`pd.read_parquet("scored/")`: every part is written with the schema of the
+first one. Rerunning the same command after a crash resumes from the last
+completed chunk.
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+from instrumentation import metrics
+from parallel_scoring import ParallelScorer
+from preprocessor import TextPreprocessor
+from sentiment_analyzer import BERT_MODEL_TYPES, RESULT_DTYPES, SentimentAnalyzer, to_arrow
+
+PROGRESS_FILE = "_progress.json"
+
+def iter_chunks(input_path, chunk_size):
+    """Yield DataFrame chunks of at most `chunk_size` rows without loading the whole file"""
+    if input_path.endswith(".parquet") or os.path.isdir(input_path):
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(input_path, format="parquet")
+        for batch in dataset.to_batches(batch_size=chunk_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+def load_progress(output_dir, settings):
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return {"settings": settings, "completed_chunks": 0, "rows": 0}
+    with open(path) as f:
+        progress = json.load(f)
+    if progress["settings"] != settings:
+        raise ValueError(
+            f"{output_dir} holds results from a run with different settings; "
+            "use a new output directory or --restart"
+        )
+    return progress
+
+def save_progress(output_dir, progress):
+    path = os.path.join(output_dir, PROGRESS_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
+
+def part_schema(table):
+    """Schema every part is written with: the first part's, with its all-empty columns as strings.
+
+    pandas guesses each CSV chunk's types on its own (an empty column reads
+    as float64), so later parts are cast to this instead.
+    """
+    import pyarrow as pa
+    fields = [
+        field.with_type(pa.string()) if column.null_count == len(column) else field
+        for field, column in zip(table.schema, table.columns)
+    ]
+    return pa.schema(fields)
+
+def encode_schema(schema):
+    return base64.b64encode(schema.serialize().to_pybytes()).decode("ascii")
+
+def decode_schema(encoded):
+    import pyarrow as pa
+    return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(encoded)))
+
+def chunk_table(df):
+    """Arrow table of a scored chunk; result columns go through to_arrow, the rest through pyarrow"""
+    import pyarrow as pa
+    result_columns = [column for column in df.columns if column in RESULT_DTYPES]
+    table = pa.Table.from_pandas(df.drop(columns=result_columns), preserve_index=False)
+    for name, column in zip(result_columns, to_arrow(df[result_columns]).columns):
+        table = table.append_column(name, column)
+    return table.select(list(df.columns))
+
+def write_part(output_dir, index, df, schema=None):
+    """Write one chunk atomically so a crash never leaves a half-written part behind.
+
+    Returns the schema it was written with, cast to `schema` when given.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = chunk_table(df)
+    if schema is None:
+        schema = part_schema(table.replace_schema_metadata(None))
+    if table.schema.names != schema.names:
+        raise ValueError(f"Chunk {index} has columns {table.schema.names}, expected {schema.names}")
+    try:
+        table = table.cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Chunk {index} does not fit the schema of earlier parts: {e}") from e
+
+    path = os.path.join(output_dir, f"part-{index:05d}.parquet")
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return schema
+
+def score_chunk(chunk, text_column, preprocessor, analyzer, n_jobs=None, parallel=None):
+    if text_column not in chunk.columns:
+        raise ValueError(f"Column '{text_column}' not found in input")
+    chunk = chunk.reset_index(drop=True)
+    if parallel is not None:
+        return parallel.score_frame(chunk, text_column)
+    chunk["processed_text"] = preprocessor.preprocess_batch(chunk[text_column], n_jobs=n_jobs)
+    results = analyzer.analyze_batch(chunk["processed_text"])
+    return pd.concat([chunk, results], axis=1)
+
+def run(input_path, output_dir, text_column="review_text", model_type="vader",
+        chunk_size=50000, batch_size=32, n_jobs=None, workers=1, restart=False):
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {
+        "input": os.path.abspath(input_path),
+        "text_column": text_column,
+        "model": model_type,
+        "chunk_size": chunk_size
+    }
+    if restart:
+        for name in os.listdir(output_dir):
+            if name == PROGRESS_FILE or name.startswith("part-"):
+                os.remove(os.path.join(output_dir, name))
+    progress = load_progress(output_dir, settings)
+    if progress["completed_chunks"]:
+        logging.info(f"Resuming after chunk {progress['completed_chunks']} ({progress['rows']} rows done)")
+
+    preprocessor = TextPreprocessor()
+    analyzer = SentimentAnalyzer(model_type=model_type, batch_size=batch_size)
+    parallel = None
+    if workers > 1:
+        parallel = ParallelScorer(
+            model_type=model_type,
+            workers=workers,
+            chunk_size=max(1, min(5000, chunk_size // workers)),
+            batch_size=batch_size
+        )
+    started = time.perf_counter()
+    scored_rows = 0
+
+    try:
+        for index, chunk in enumerate(iter_chunks(input_path, chunk_size)):
+            if index < progress["completed_chunks"]:
+                continue
+            chunk_started = time.perf_counter()
+            scored = score_chunk(chunk, text_column, preprocessor, analyzer, n_jobs, parallel)
+            schema = progress.get("schema")
+            schema = write_part(output_dir, index, scored, schema and decode_schema(schema))
+
+            progress["schema"] = encode_schema(schema)
+            progress["completed_chunks"] = index + 1
+            progress["rows"] += len(scored)
+            save_progress(output_dir, progress)
+
+            scored_rows += len(scored)
+            elapsed = time.perf_counter() - chunk_started
+            logging.info(
+                f"Chunk {index}: {len(scored)} rows in {elapsed:.1f}s "
+                f"({len(scored) / elapsed:.0f} rows/sec, {progress['rows']} total)"
+            )
+    finally:
+        if parallel is not None:
+            parallel.close()
+
+    total_elapsed = time.perf_counter() - started
+    rate = scored_rows / total_elapsed if total_elapsed > 0 else 0.0
+    logging.info(f"Scored {scored_rows} rows in {total_elapsed:.1f}s ({rate:.0f} rows/sec)")
+    return {"rows": scored_rows, "seconds": total_elapsed, "rows_per_sec": rate}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch sentiment scoring for CSV/Parquet review files")
+    parser.add_argument("input", help="CSV file, Parquet file or directory of Parquet files")
+    parser.add_argument("output_dir", help="Directory that receives Parquet result parts")
+    parser.add_argument("--text-column", default="review_text")
+    parser.add_argument("--model", choices=["vader", *BERT_MODEL_TYPES], default="vader")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows read and written per chunk")
+    parser.add_argument("--batch-size", type=int, default=32, help="BERT micro-batch size")
+    parser.add_argument("--jobs", type=int, default=None, help="Processes used for preprocessing")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes that each preprocess and score a shard of every chunk")
+    parser.add_argument("--restart", action="store_true", help="Ignore earlier progress in output_dir")
+    parser.add_argument("--metrics", default=None,
+                        help="Write stage timings and counters here (.json, or .prom for Prometheus text)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args(argv)
+    metrics.enabled = metrics.enabled or bool(args.metrics)
+    try:
+        run(
+            args.input, args.output_dir,
+            text_column=args.text_column,
+            model_type=args.model,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            n_jobs=args.jobs,
+            workers=args.workers,
+            restart=args.restart
+        )
+    except Exception as e:
+        logging.error(f"Batch scoring failed: {e}")
+        return 1
+    finally:
+        if args.metrics:
+            metrics.export(args.metrics)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Compare the int8 and ONNX BERT backends against the fp32 model.
+
+    python -m benchmarks.bert_backends --reviews 2000 --output bert_backends.json
+    python -m benchmarks.bert_backends --input reviews.csv --text-column review_text
+
+Every backend loads from the same local model directory in a fresh
+process, so its memory numbers are not polluted by the others. Reported
+per backend: load time, throughput, p50/p99 per batch, RSS growth from
+loading (including importing its runtime) and from scoring, and label
+agreement / mean absolute score difference against fp32.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.run import git_commit, measure, peak_rss_mb
+from benchmarks.synthetic import generate_reviews
+
+BACKENDS = {
+    "fp32": "load_local",
+    "int8": "load_quantized",
+    "onnx": "load_onnx",
+}
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+def _score_with_backend(backend, path, texts, batch_size, threads, queue):
+    """Run in a child process: load one backend, score `texts`, report back"""
+    try:
+        import bert_backends
+        from resources import registry
+        from sentiment_analyzer import SentimentAnalyzer
+
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        classifier = getattr(bert_backends, BACKENDS[backend])(path, threads=threads)
+        load_s = time.perf_counter() - started
+        rss_loaded = current_rss_mb()
+
+        # This process is fresh, so pointing the registry at the backend is safe
+        registry.register("bert", lambda: classifier)
+        analyzer = SentimentAnalyzer(model_type="bert", batch_size=batch_size)
+
+        batches = [texts[i:i + batch_size * 8] for i in range(0, len(texts), batch_size * 8)]
+        results = []
+        stats = measure(
+            lambda i: results.append(analyzer.analyze_batch(batches[i])), len(batches),
+            items_per_call=len(texts) / len(batches), warmup=0
+        )
+        scored = pd.concat(results, ignore_index=True)
+        queue.put({
+            "backend": backend,
+            "load_s": load_s,
+            "rss_load_mb": rss_loaded - rss_before,
+            "rss_scoring_mb": current_rss_mb() - rss_loaded,
+            "stats": stats,
+            "labels": scored["label"].tolist(),
+            "scores": scored["score"].tolist(),
+        })
+    except Exception as e:
+        queue.put({"backend": backend, "error": f"{type(e).__name__}: {e}"})
+
+def run_backend(backend, path, texts, batch_size, threads):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_score_with_backend, args=(backend, path, texts, batch_size, threads, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def run(texts, path=None, batch_size=32, threads=None, backends=tuple(BACKENDS)):
+    import bert_backends
+    path = path or bert_backends.model_dir()
+    threads = threads or bert_backends.thread_budget()
+
+    outputs = {}
+    for backend in backends:
+        logging.info(f"Scoring {len(texts)} texts with {backend}")
+        outputs[backend] = run_backend(backend, path, texts, batch_size, threads)
+
+    reference = outputs.get("fp32")
+    report = {}
+    for backend, output in outputs.items():
+        if "error" in output:
+            report[backend] = {"error": output["error"]}
+            continue
+        entry = {
+            "load_s": output["load_s"],
+            "throughput_per_s": output["stats"]["throughput_per_s"],
+            "p50_batch_ms": output["stats"]["p50_ms"],
+            "p99_batch_ms": output["stats"]["p99_ms"],
+            "rss_load_mb": output["rss_load_mb"],
+            "rss_scoring_mb": output["rss_scoring_mb"],
+        }
+        if reference is not None and "error" not in reference:
+            labels = pd.Series(output["labels"])
+            scores = pd.Series(output["scores"])
+            entry["label_agreement"] = float((labels == pd.Series(reference["labels"])).mean())
+            entry["mean_abs_score_diff"] = float((scores - pd.Series(reference["scores"])).abs().mean())
+            base = reference["stats"]["throughput_per_s"]
+            entry["speedup_vs_fp32"] = entry["throughput_per_s"] / base if base else None
+            entry["rss_load_delta_mb"] = entry["rss_load_mb"] - reference["rss_load_mb"]
+        report[backend] = entry
+
+    return {
+        "commit": git_commit(),
+        "model_dir": path,
+        "config": {"texts": len(texts), "batch_size": batch_size, "threads": threads},
+        "backends": report,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare BERT CPU backends against fp32")
+    parser.add_argument("--input", default=None, help="CSV of local reviews (default: synthetic reviews)")
+    parser.add_argument("--text-column", default="review_text")
+    parser.add_argument("--reviews", type=int, default=2000, help="Reviews to score")
+    parser.add_argument("--profile", choices=["short", "mixed", "long"], default="mixed")
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--output", default="bert_backends.json")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if args.input:
+        texts = pd.read_csv(args.input, usecols=[args.text_column], nrows=args.reviews)[args.text_column]
+        texts = texts.fillna("").astype(str).tolist()
+    else:
+        texts = generate_reviews(args.reviews, profile=args.profile)["review_text"].tolist()
+
+    report = run(texts, args.model_dir, args.batch_size, args.threads, tuple(args.backends.split(",")))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for backend, entry in report["backends"].items():
+        if "error" in entry:
+            print(f"{backend:6s} unavailable: {entry['error']}")
+            continue
+        line = (f"{backend:6s} {entry['throughput_per_s']:>9.1f} texts/s  "
+                f"load {entry['load_s']:5.1f}s  rss +{entry['rss_load_mb']:7.1f}MB")
+        if "label_agreement" in entry:
+            line += (f"  agreement {entry['label_agreement']:.2%}  "
+                     f"|dscore| {entry['mean_abs_score_diff']:.4f}  x{entry['speedup_vs_fp32']:.2f}")
+        print(line)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Per-page parse cost of each review parser backend on the saved fixtures.
+
+    python -m benchmarks.parsers --runs 200
+"""
+import argparse
+
+from benchmarks.run import load_fixture_pages, measure
+from review_parsers import PARSER_BACKENDS
+
+def run(runs=200):
+    pages = load_fixture_pages()
+    results = {}
+    for name, factory in PARSER_BACKENDS.items():
+        try:
+            parser = factory()
+        except ImportError as e:
+            results[name] = {"error": str(e)}
+            continue
+        results[name] = measure(lambda i: parser.parse(pages[i % len(pages)]), runs)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare review page parser backends")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    for name, stats in run(args.runs).items():
+        if "error" in stats:
+            print(f"{name:12s} unavailable: {stats['error']}")
+        else:
+            print(f"{name:12s} p50 {stats['p50_ms']:7.2f}ms/page  p99 {stats['p99_ms']:7.2f}ms/page")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Memory and speed of the columnar analyze_batch layout against the old one.
+
+    python -m benchmarks.result_layout --rows 1000000
+
+The old layout kept sentiment as Python strings, a `scores` column with one
+dict per row and float64 score columns; the new one is a categorical
+sentiment plus float32 columns. Both are built from the same random VADER
+style scores so only the representation differs. Memory is measured with
+tracemalloc while each frame is built (it sees the dicts and floats that
+`memory_usage(deep=True)` misses).
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run import git_commit
+from sentiment_analyzer import SENTIMENT_DTYPE, to_arrow
+
+def random_scores(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    parts = rng.dirichlet([1.0, 3.0, 1.5], size=rows)
+    return {
+        'neg': parts[:, 0],
+        'neu': parts[:, 1],
+        'pos': parts[:, 2],
+        'compound': np.tanh(rng.normal(0.2, 0.6, rows)),
+    }
+
+def old_layout(columns):
+    compound = columns['compound']
+    df = pd.DataFrame({
+        'sentiment': np.where(compound >= 0.05, 'positive',
+                              np.where(compound <= -0.05, 'negative', 'neutral')).astype(object),
+        'scores': [
+            {'neg': neg, 'neu': neu, 'pos': pos, 'compound': comp}
+            for neg, neu, pos, comp in zip(
+                columns['neg'].tolist(), columns['neu'].tolist(),
+                columns['pos'].tolist(), compound.tolist()
+            )
+        ]
+    })
+    for column in ['compound', 'pos', 'neg', 'neu']:
+        df[column] = columns[column]
+    return df
+
+def new_layout(columns):
+    compound = columns['compound']
+    codes = np.where(compound >= 0.05, 2, np.where(compound <= -0.05, 0, 1))
+    return pd.DataFrame({
+        'sentiment': pd.Categorical.from_codes(codes, dtype=SENTIMENT_DTYPE),
+        'compound': compound.astype(np.float32),
+        'pos': columns['pos'].astype(np.float32),
+        'neg': columns['neg'].astype(np.float32),
+        'neu': columns['neu'].astype(np.float32),
+    })
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def profile(name, build, columns):
+    tracemalloc.start()
+    started = time.perf_counter()
+    df = build(columns)
+    build_s = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def strongly_negative():
+        return df[(df['sentiment'] == 'negative') & (df['compound'] < -0.5)]
+
+    arrow = to_arrow(df.drop(columns=['scores'], errors='ignore'))
+    return {
+        "layout": name,
+        "build_s": build_s,
+        "traced_mb": current / (1024 * 1024),
+        "traced_peak_mb": peak / (1024 * 1024),
+        "memory_usage_deep_mb": df.memory_usage(deep=True).sum() / (1024 * 1024),
+        "filter_ms": timed(strongly_negative),
+        "to_arrow_ms": timed(lambda: to_arrow(df.drop(columns=['scores'], errors='ignore'))),
+        "arrow_mb": arrow.nbytes / (1024 * 1024),
+        "to_records_ms": timed(lambda: df.head(100000).to_dict('records'), repeat=1),
+    }
+
+def run(rows=1_000_000, seed=0):
+    columns = random_scores(rows, seed)
+    results = [profile("old", old_layout, columns), profile("new", new_layout, columns)]
+    old, new = results
+    return {
+        "commit": git_commit(),
+        "rows": rows,
+        "layouts": results,
+        "memory_ratio": old["traced_mb"] / new["traced_mb"] if new["traced_mb"] else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare analyze_batch result layouts")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    for entry in report["layouts"]:
+        print(f"{entry['layout']:4s} {entry['traced_mb']:8.1f}MB traced  "
+              f"{entry['memory_usage_deep_mb']:8.1f}MB memory_usage  "
+              f"build {entry['build_s']:6.2f}s  filter {entry['filter_ms']:7.1f}ms  "
+              f"to_arrow {entry['to_arrow_ms']:7.1f}ms")
+    print(f"old/new memory: {report['memory_ratio']:.1f}x")
+
+if __name__ == "__main__":
+    main()
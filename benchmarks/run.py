@@ -0,0 +1,271 @@
+"""Benchmark the preprocess -> analyze -> visualize hot path.
+
+    python -m benchmarks.run --reviews 2000 --output bench.json
+
+Every case reports throughput, p50/p99 latency and the peak RSS of its
+process after it ran. Each group of cases (preprocess, analyzer[vader],
+visualizer, ...) runs in a fresh process, so the peak is the group's own
+rather than the largest of every earlier group; cases within a group run
+in order and share their process's peak. Results are written as JSON
+tagged with the current git commit so runs can be diffed across commits. Cases whose dependencies are
+unavailable (BERT weights, NLTK data) are recorded with their error
+instead of aborting the run.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from benchmarks.synthetic import generate_reviews
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def peak_rss_mb():
+    """Peak RSS of this process so far, not of the latest case alone"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(fn, calls, items_per_call=1, warmup=1):
+    """Time `fn` over `calls` invocations and summarize the latencies"""
+    for _ in range(warmup):
+        fn(0)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(calls):
+        call_started = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+    return {
+        "calls": calls,
+        "items": calls * items_per_call,
+        "total_s": total,
+        "throughput_per_s": calls * items_per_call / total if total > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+class FixtureAdapter(requests.adapters.BaseAdapter):
+    """Serve saved review pages to a requests.Session without touching the network"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        page = int(parse_qs(urlparse(request.url).query)["pageNumber"][0])
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response._content = self.pages[(page - 1) % len(self.pages)]
+        return response
+
+    def close(self):
+        pass
+
+def load_fixture_pages():
+    pages = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+                pages.append(f.read())
+    return pages
+
+def bench_preprocess(reviews):
+    from preprocessor import TextPreprocessor
+    preprocessor = TextPreprocessor()
+    texts = reviews["review_text"].tolist()
+    return {
+        "preprocess": measure(lambda i: preprocessor.preprocess(texts[i]), len(texts)),
+        "preprocess_batch": measure(
+            lambda i: preprocessor.preprocess_batch(texts), 3, items_per_call=len(texts)
+        ),
+    }
+
+def bench_analyzer(model_type, texts, batch_size):
+    from sentiment_analyzer import SentimentAnalyzer
+    analyzer = SentimentAnalyzer(model_type=model_type)
+    if analyzer.model_type != model_type:
+        raise RuntimeError(f"{model_type} model unavailable, analyzer fell back to {analyzer.model_type}")
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    return {
+        f"analyze_text[{model_type}]": measure(lambda i: analyzer.analyze_text(texts[i]), len(texts)),
+        f"analyze_batch[{model_type}]": measure(
+            lambda i: analyzer.analyze_batch(batches[i]), len(batches),
+            items_per_call=len(texts) / len(batches)
+        ),
+    }
+
+def bench_collector(pages_per_run=10, runs=20):
+    from data_collector import ReviewCollector
+    collector = ReviewCollector(requests_per_second=1e9, burst=1e9)
+    adapter = FixtureAdapter(load_fixture_pages())
+    collector.session.mount("https://", adapter)
+    collector.session.mount("http://", adapter)
+    return {
+        "get_amazon_reviews[fixtures]": measure(
+            lambda i: collector.get_amazon_reviews("B000000000", max_pages=pages_per_run),
+            runs, items_per_call=pages_per_run
+        ),
+    }
+
+def bench_visualizer(reviews, runs=5):
+    import matplotlib
+    matplotlib.use("Agg")
+    from rollups import SentimentRollup
+    from visualizer import SentimentVisualizer, WordCloudEngine
+    visualizer = SentimentVisualizer()
+    sentiments = ["positive", "negative", "neutral"]
+    df = reviews.assign(sentiment=[sentiments[i % 3] for i in range(len(reviews))])
+    rollup = SentimentRollup()
+    rollup.add(df)
+    # Lower-cased text stands in for preprocessor output here
+    processed = df["review_text"].str.lower()
+    wordclouds = WordCloudEngine()
+    wordclouds.add(processed, df["sentiment"])
+    uncached_wordclouds = WordCloudEngine(max_images=0)
+    uncached_wordclouds.add(processed, df["sentiment"])
+    return {
+        "create_wordcloud": measure(lambda i: visualizer.create_wordcloud(df["review_text"]), runs),
+        "wordcloud_engine_add": measure(
+            lambda i: WordCloudEngine().add(processed, df["sentiment"]), runs, items_per_call=len(df)
+        ),
+        "wordcloud_engine_render": measure(lambda i: uncached_wordclouds.render([sentiments[i % 3]]), runs),
+        "wordcloud_engine_render[cached]": measure(lambda i: wordclouds.render([sentiments[i % 3]]), runs),
+        "plot_sentiment_trends": measure(lambda i: visualizer.plot_sentiment_trends(df), runs),
+        "create_category_analysis": measure(lambda i: visualizer.create_category_analysis(df), runs),
+        "sentiment_distribution": measure(lambda i: visualizer.sentiment_distribution(df), runs),
+        "rollup_add": measure(lambda i: SentimentRollup().add(df), runs, items_per_call=len(df)),
+        "plot_trend_table[rollup]": measure(
+            lambda i: visualizer.plot_trend_table(rollup.trend_table("week"), "week"), runs
+        ),
+        "category_chart[rollup]": measure(lambda i: visualizer.category_chart(rollup.category_table()), runs),
+    }
+
+def bench_dedup(n_reviews, profile, seed, runs=3):
+    from dedup import ReviewDeduplicator
+    from sentiment_analyzer import SentimentAnalyzer
+    reviews = generate_reviews(n_reviews, profile=profile, seed=seed, duplicate_rate=0.3)
+    # Lower-cased text stands in for preprocessor output here
+    processed = reviews["review_text"].str.lower()
+    analyzer = SentimentAnalyzer()
+    return {
+        "dedup_assign[30% duplicates]": measure(
+            lambda i: ReviewDeduplicator().assign(processed), runs, items_per_call=len(processed)
+        ),
+        "dedup_score[vader,30% duplicates]": measure(
+            lambda i: ReviewDeduplicator().score(processed, analyzer), runs, items_per_call=len(processed)
+        ),
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(FIXTURES_DIR),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def run_case(name, config):
+    """Build the inputs of case group `name` from `config` and run it in this process"""
+    reviews = generate_reviews(config["reviews"], profile=config["profile"], seed=config["seed"])
+    if name == "preprocess":
+        return bench_preprocess(reviews)
+    if name.startswith("analyzer["):
+        return bench_analyzer(name[len("analyzer["):-1], reviews["review_text"].tolist(), config["batch_size"])
+    if name == "collector":
+        return bench_collector()
+    if name == "visualizer":
+        return bench_visualizer(reviews)
+    if name == "dedup":
+        return bench_dedup(config["reviews"], config["profile"], config["seed"])
+    raise KeyError(f"Unknown benchmark case: {name}")
+
+def _run_case_in_child(name, config, queue):
+    try:
+        queue.put({"results": run_case(name, config)})
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+def run_case_in_subprocess(name, config):
+    """Run a case group in a fresh process so its peak RSS is its own"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_case_in_child, args=(name, config, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result["results"]
+
+def run(n_reviews=2000, profile="mixed", seed=0, batch_size=32, models=("vader", "bert")):
+    config = {"reviews": n_reviews, "profile": profile, "seed": seed, "batch_size": batch_size}
+    cases = ["preprocess", *(f"analyzer[{model_type}]" for model_type in models),
+             "collector", "visualizer", "dedup"]
+
+    results = {}
+    errors = {}
+    for name in cases:
+        logging.info(f"Running {name}")
+        try:
+            results.update(run_case_in_subprocess(name, config))
+        except Exception as e:
+            logging.warning(f"Skipping {name}: {e}")
+            errors[name] = str(e)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "results": results,
+        "errors": errors,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sentiment analysis hot path")
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--profile", choices=["short", "mixed", "long"], default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--models", default="vader,bert", help="Comma-separated analyzer models")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    report = run(args.reviews, args.profile, args.seed, args.batch_size, tuple(args.models.split(",")))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in report["results"].items():
+        print(f"{name:32s} {stats['throughput_per_s']:>12.1f}/s  "
+              f"p50 {stats['p50_ms']:8.2f}ms  p99 {stats['p99_ms']:8.2f}ms  "
+              f"peak rss {stats['peak_rss_mb']:7.1f}MB")
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Startup cost of the Streamlit app.
+
+    python -m benchmarks.startup --runs 5 --reruns 20 --output startup.json
+
+Measures, each in fresh processes:
+
+- `import app`: wall time and which heavy modules it pulls in
+- `streamlit run app.py`: time until the server answers its health check,
+  then over a websocket session the time from requesting the first script
+  run to the first rendered element (first paint) and to the end of the
+  run, plus the duration of later reruns in the same session
+
+The websocket client needs the `websockets` package; without it only the
+import numbers are reported.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.run import git_commit, percentile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+HEAVY_MODULES = ["matplotlib", "wordcloud", "plotly.express", "nltk", "transformers", "torch", "onnxruntime"]
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(json.dumps({{"import_s": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [APP_DIR, env.get("PYTHONPATH")]))
+    return env
+
+def summarize(values):
+    return {
+        "runs": len(values),
+        "median_s": statistics.median(values),
+        "min_s": min(values),
+        "p90_s": percentile(values, 90),
+    }
+
+def bench_import(runs):
+    timings = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT], cwd=APP_DIR, env=child_env(),
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        timings.append(result["import_s"])
+        loaded = result["loaded"]
+    return {"import_app": summarize(timings), "heavy_modules_loaded": loaded}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def _script_runs(port, reruns):
+    """(first paint, first run) of a new session, then the duration of each rerun"""
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    async def run_script(ws):
+        request = BackMsg()
+        request.rerun_script.query_string = ""
+        started = time.perf_counter()
+        await ws.send(request.SerializeToString())
+        first_delta = None
+        while True:
+            message = ForwardMsg()
+            message.ParseFromString(await ws.recv())
+            kind = message.WhichOneof("type")
+            if kind == "delta" and first_delta is None:
+                first_delta = time.perf_counter() - started
+            elif kind == "script_finished":
+                return first_delta, time.perf_counter() - started
+
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        first_paint, first_run = await run_script(ws)
+        rerun_times = [(await run_script(ws))[1] for _ in range(reruns)]
+    return first_paint, first_run, rerun_times
+
+def streamlit_session(reruns, timeout=60):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=APP_DIR, env=child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).read()
+                break
+            except OSError:
+                if time.perf_counter() - started > timeout or server.poll() is not None:
+                    raise RuntimeError("streamlit server did not become healthy")
+                time.sleep(0.05)
+        server_ready = time.perf_counter() - started
+        first_paint, first_run, rerun_times = asyncio.run(_script_runs(port, reruns))
+        return server_ready, first_paint, first_run, rerun_times
+    finally:
+        server.terminate()
+        server.wait()
+
+def bench_streamlit(runs, reruns):
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        return {"error": "install `websockets` to measure `streamlit run`"}
+    ready, paints, first_runs, reruns_s = [], [], [], []
+    for _ in range(runs):
+        server_ready, first_paint, first_run, rerun_times = streamlit_session(reruns)
+        ready.append(server_ready)
+        paints.append(first_paint)
+        first_runs.append(first_run)
+        reruns_s.extend(rerun_times)
+    report = {
+        "server_ready": summarize(ready),
+        "first_paint": summarize(paints),
+        "first_run": summarize(first_runs),
+    }
+    if reruns_s:
+        report["rerun"] = summarize(reruns_s)
+    return report
+
+def run(runs=5, reruns=20):
+    return {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {"runs": runs, "reruns": reruns},
+        "import": bench_import(runs),
+        "streamlit": bench_streamlit(runs, reruns),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app import, first paint and rerun times")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns timed per streamlit session")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.reruns)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    imported = report["import"]
+    print(f"import app      {imported['import_app']['median_s'] * 1000:8.1f}ms  "
+          f"heavy modules: {', '.join(imported['heavy_modules_loaded']) or 'none'}")
+    streamlit = report["streamlit"]
+    if "error" in streamlit:
+        print(f"streamlit run   unavailable: {streamlit['error']}")
+        return
+    for name in ["server_ready", "first_paint", "first_run", "rerun"]:
+        if name in streamlit:
+            print(f"{name:15s} {streamlit[name]['median_s'] * 1000:8.1f}ms  (p90 {streamlit[name]['p90_s'] * 1000:.1f}ms)")
+
+if __name__ == "__main__":
+    main()
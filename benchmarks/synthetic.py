@@ -0,0 +1,100 @@
+"""Deterministic synthetic review generator for benchmarks."""
+import html
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+OPENERS = [
+    "I bought this for my son", "Ordered this last month", "This is my second one",
+    "Got this on sale", "Replaced my old one with this", "Gift for my wife",
+]
+POSITIVE = [
+    "works great", "the battery life is amazing", "really happy with the quality",
+    "setup was super easy", "love the design", "totally worth the price",
+]
+NEGATIVE = [
+    "stopped working after a week", "the screen is terrible", "very disappointed",
+    "customer support was awful", "feels cheap and flimsy", "broke on the second day",
+]
+NEUTRAL = [
+    "it arrived on Tuesday", "the box contains a cable and a manual",
+    "it comes in three colors", "it is about the size of a phone",
+]
+NEGATIONS = ["not", "never", "didn't", "wouldn't", "isn't", "hardly"]
+BOOSTERS = ["very", "extremely", "SO", "kind of", "barely", "absolutely"]
+EMOJI = ["😀", "😍", "👍", "😡", "👎", "💔", "🙂", ":)", ":("]
+CATEGORIES = ["Electronics", "Home & Kitchen", "Toys & Games", "Books", "Unknown"]
+
+# Word-count distributions roughly matching short, typical and long-form reviews
+LENGTH_PROFILES = {
+    "short": (3, 15),
+    "mixed": (3, 120),
+    "long": (150, 600),
+}
+
+def _sentence(rng):
+    roll = rng.random()
+    clause = rng.choice(POSITIVE if roll < 0.45 else NEGATIVE if roll < 0.8 else NEUTRAL)
+    if rng.random() < 0.25:
+        clause = f"{rng.choice(NEGATIONS)} {clause}"
+    if rng.random() < 0.25:
+        clause = f"{rng.choice(BOOSTERS)} {clause}"
+    if rng.random() < 0.1:
+        clause = clause.upper()
+    if rng.random() < 0.15:
+        clause += " " + rng.choice(EMOJI)
+    return clause + rng.choice([".", "!", "!!", "?", "..."])
+
+def generate_review(rng, profile="mixed"):
+    low, high = LENGTH_PROFILES[profile]
+    target = rng.randint(low, high)
+    parts = [rng.choice(OPENERS) + "."]
+    words = len(parts[0].split())
+    while words < target:
+        sentence = _sentence(rng)
+        if rng.random() < 0.1:
+            sentence = "but " + sentence
+        parts.append(sentence)
+        words += len(sentence.split())
+    return " ".join(parts)
+
+def generate_reviews(n, profile="mixed", seed=0, duplicate_rate=0.0):
+    """Return a DataFrame shaped like ReviewCollector output"""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    texts = []
+    for _ in range(n):
+        if texts and rng.random() < duplicate_rate:
+            texts.append(rng.choice(texts))
+        else:
+            texts.append(generate_review(rng, profile))
+    return pd.DataFrame({
+        "review_text": texts,
+        "date": [start + timedelta(days=rng.randint(0, 364)) for _ in range(n)],
+        "category": [rng.choice(CATEGORIES) for _ in range(n)],
+    })
+
+def render_review_page(reviews, category="Electronics"):
+    """Render reviews using the markup ReviewCollector scrapes"""
+    blocks = []
+    for i, row in enumerate(reviews.itertuples()):
+        blocks.append(
+            f'<div id="R{i:012d}" data-hook="review" class="a-section review aok-relative">'
+            f'<div class="a-row"><a class="a-profile" href="#"><span class="a-profile-name">Customer {i}</span></a></div>'
+            f'<div class="a-row"><i data-hook="review-star-rating" class="a-icon a-icon-star">'
+            f'<span class="a-icon-alt">4.0 out of 5 stars</span></i></div>'
+            f'<span data-hook="review-date" class="a-size-base a-color-secondary review-date">'
+            f'Reviewed in the United States on {row.date:%B} {row.date.day}, {row.date.year}</span>'
+            f'<div class="a-row a-spacing-small review-data">'
+            f'<span data-hook="review-body" class="a-size-base review-text">'
+            f'<span>{html.escape(row.review_text)}</span></span></div></div>'
+        )
+    return (
+        '<!doctype html><html><head><title>Customer reviews</title></head><body>'
+        '<div id="wayfinding-breadcrumbs_feature_div"><ul>'
+        f'<li><a class="a-link-normal a-color-tertiary" href="#">\n {category}\n </a></li>'
+        '</ul></div><div id="cm_cr-review_list">'
+        + "".join(blocks) +
+        '</div></body></html>'
+    )
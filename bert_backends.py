@@ -0,0 +1,173 @@
+"""CPU backends for the BERT sentiment model.
+
+    python bert_backends.py save ~/.cache/sentiment_analysis/bert
+    python bert_backends.py export-onnx ~/.cache/sentiment_analysis/bert
+
+`save` downloads the default sentiment pipeline model once; after that the
+'bert-int8' and 'bert-onnx' analyzers load everything from the directory
+(SENTIMENT_BERT_DIR, defaulting to the path above) without network access.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sentiment_analysis", "bert")
+ONNX_FILENAME = "model.onnx"
+
+def model_dir():
+    return os.environ.get("SENTIMENT_BERT_DIR", DEFAULT_MODEL_DIR)
+
+def thread_budget():
+    """Intra-op threads for CPU inference (SENTIMENT_BERT_THREADS, default up to 4)"""
+    threads = os.environ.get("SENTIMENT_BERT_THREADS")
+    return int(threads) if threads else min(4, os.cpu_count() or 1)
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+class SequenceClassifier:
+    """Tokenizer plus a logits function, the interface SentimentAnalyzer's BERT path uses.
+
+    Calling it on a text returns `[{'label': ..., 'score': ...}]` like a
+    transformers sentiment pipeline.
+    """
+
+    def __init__(self, tokenizer, config, backend):
+        self.tokenizer = tokenizer
+        self.config = config
+        self.backend = backend
+
+    @property
+    def revision(self):
+        commit = getattr(self.config, '_commit_hash', None) or 'local'
+        return f"{self.config._name_or_path}@{commit}[{self.backend}]"
+
+    def logits(self, inputs):
+        """Logits for a dict of padded numpy arrays from the tokenizer"""
+        raise NotImplementedError
+
+    def __call__(self, text):
+        inputs = self.tokenizer([text], truncation=True, return_tensors='np')
+        probabilities = softmax(self.logits(dict(inputs)))[0]
+        best = int(probabilities.argmax())
+        return [{'label': self.config.id2label[best], 'score': float(probabilities[best])}]
+
+class TorchSequenceClassifier(SequenceClassifier):
+    def __init__(self, model, tokenizer, backend="fp32"):
+        super().__init__(tokenizer, model.config, backend)
+        self.model = model.eval()
+
+    def logits(self, inputs):
+        import torch
+        with torch.inference_mode():
+            tensors = {key: torch.from_numpy(value).to(self.model.device) for key, value in inputs.items()}
+            return self.model(**tensors).logits.float().cpu().numpy()
+
+class OnnxSequenceClassifier(SequenceClassifier):
+    def __init__(self, session, tokenizer, config):
+        super().__init__(tokenizer, config, "onnx")
+        self.session = session
+        self.input_names = [node.name for node in session.get_inputs()]
+
+    def logits(self, inputs):
+        feed = {name: inputs[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(None, feed)[0]
+
+def load_pipeline():
+    """The default fp32 transformers pipeline (downloads the model on first use)"""
+    from transformers import pipeline
+    classifier = pipeline("sentiment-analysis")
+    return TorchSequenceClassifier(classifier.model, classifier.tokenizer)
+
+def _load_pretrained(path):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No local BERT model in {path}; run `python bert_backends.py save {path}`")
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(path, local_files_only=True)
+    return model, tokenizer
+
+def load_local(path=None, threads=None):
+    """fp32 model from a local directory"""
+    import torch
+    torch.set_num_threads(threads or thread_budget())
+    model, tokenizer = _load_pretrained(path or model_dir())
+    return TorchSequenceClassifier(model, tokenizer, "fp32-local")
+
+def load_quantized(path=None, threads=None):
+    """Local model with its Linear layers dynamically quantized to int8"""
+    import torch
+    torch.set_num_threads(threads or thread_budget())
+    model, tokenizer = _load_pretrained(path or model_dir())
+    quantized = torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+    return TorchSequenceClassifier(quantized, tokenizer, "int8")
+
+def load_onnx(path=None, threads=None):
+    """ONNX Runtime session over an exported model, with a fixed thread budget"""
+    import onnxruntime
+    from transformers import AutoConfig, AutoTokenizer
+    path = path or model_dir()
+    onnx_path = os.path.join(path, ONNX_FILENAME)
+    if not os.path.exists(onnx_path):
+        raise FileNotFoundError(f"No {ONNX_FILENAME} in {path}; run `python bert_backends.py export-onnx {path}`")
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads or thread_budget()
+    options.inter_op_num_threads = 1
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+    config = AutoConfig.from_pretrained(path, local_files_only=True)
+    return OnnxSequenceClassifier(session, tokenizer, config)
+
+def save_default_model(path):
+    """Download the default sentiment pipeline model into `path`"""
+    from transformers import pipeline
+    classifier = pipeline("sentiment-analysis")
+    classifier.model.save_pretrained(path)
+    classifier.tokenizer.save_pretrained(path)
+    return path
+
+def export_onnx(path, opset=14):
+    """Export the local model in `path` to `path/model.onnx` with dynamic batch and sequence axes"""
+    import inspect
+    import torch
+    model, tokenizer = _load_pretrained(path)
+    model.eval()
+    sample = tokenizer(["an example review"], return_tensors='pt')
+    # Graph inputs follow forward()'s parameter order, not the tokenizer's.
+    names = [name for name in inspect.signature(model.forward).parameters if name in sample]
+    output_path = os.path.join(path, ONNX_FILENAME)
+    torch.onnx.export(
+        model,
+        ({name: sample[name] for name in names},),
+        output_path,
+        input_names=names,
+        output_names=["logits"],
+        dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names}, "logits": {0: "batch"}},
+        opset_version=opset
+    )
+    return output_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare local BERT models for offline CPU inference")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    save = subparsers.add_parser("save", help="Download the default model into a directory")
+    save.add_argument("path", nargs="?", default=None)
+    export = subparsers.add_parser("export-onnx", help="Export a saved model to ONNX")
+    export.add_argument("path", nargs="?", default=None)
+    export.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args(argv)
+
+    path = args.path or model_dir()
+    if args.command == "save":
+        print(f"Saved model to {save_default_model(path)}")
+    else:
+        print(f"Exported {export_onnx(path, args.opset)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
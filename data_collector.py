@@ -1,68 +1,203 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from review_parsers import get_parser
+from instrumentation import metrics
 import logging
+import threading
 import time
 import random
 
+AMAZON_REVIEWS_URL = "https://www.amazon.com/product-reviews/{product_id}/ref=cm_cr_arp_d_paging_btm_next_{page}?pageNumber={page}"
+# Newest reviews first, which delta fetching against a ReviewStore relies on
+RECENT_REVIEWS_URL = AMAZON_REVIEWS_URL + "&sortBy=recent"
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 class ReviewCollector:
-    def __init__(self):
+    def __init__(self, base_url=None, requests_per_second=1.0, burst=3, max_workers=4,
+                 backoff_base=1.0, backoff_cap=16.0, parser='auto'):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.base_url = "https://www.amazon.com/product-reviews/{product_id}/ref=cm_cr_arp_d_paging_btm_next_{page}?pageNumber={page}"
+        self.base_url = base_url or AMAZON_REVIEWS_URL
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_workers = max_workers
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.parser = get_parser(parser)
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+        # One pooled session keeps connections alive across pages and workers.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    def get_amazon_reviews(self, product_id, max_pages=5, max_retries=3):
+    def get_amazon_reviews(self, product_id, max_pages=5, max_retries=3, concurrent=False, is_known=None):
+        """Collect reviews page by page, stopping at the first page without reviews"""
         reviews_data = []
-        
-        for page in range(1, max_pages + 1):
-            url = self.base_url.format(product_id=product_id, page=page)
-            retries = 0
-            while retries < max_retries:
-                try:
-                    time.sleep(2)
-                    response = requests.get(url, headers=self.headers, timeout=10)  # Add timeout
-                    response.raise_for_status()  # Raise exception for bad status codes
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    reviews = soup.find_all('div', {'data-hook': 'review'})
-                    
-                    for review in reviews:
-                        review_text = review.find('span', {'data-hook': 'review-body'})
-                        review_date = review.find('span', {'data-hook': 'review-date'})
-                        
-                        if review_text and review_date:
-                            reviews_data.append({
-                                'review_text': review_text.text.strip(),
-                                'date': datetime.strptime(
-                                    review_date.text.split('on ')[-1], 
-                                    '%B %d, %Y'
-                                ),
-                                'category': self.get_product_category(soup)
-                            })
-                    break  # Success, exit retry loop
-                except requests.RequestException as e:
-                    retries += 1
-                    if retries == max_retries:
-                        self.logger.error(f"Failed to fetch page {page} after {max_retries} attempts: {e}")
-                    else:
-                        time.sleep(retries * 2)  # Exponential backoff
-                        continue
-                
-                # Add delay to avoid rate limiting
-                time.sleep(random.uniform(1, 2))
-        
+        for page_reviews in self.iter_amazon_reviews(product_id, max_pages, max_retries, concurrent, is_known):
+            reviews_data.extend(page_reviews)
         return pd.DataFrame(reviews_data)
 
-    def get_product_category(self, soup):
-        """Extract product category from page"""
+    def iter_amazon_reviews(self, product_id, max_pages=5, max_retries=3, concurrent=False, is_known=None,
+                            stop_at_known=True, on_complete=None):
+        """Yield the parsed reviews of each page, in page order, as soon as it is available.
+
+        Pages that fail after all retries yield an empty list so callers can
+        still track progress; iteration stops at the first page without reviews.
+        With `is_known`, a predicate over review dicts, only unknown reviews
+        are yielded, and with `stop_at_known` paging also stops at the first
+        page containing an already-known review. That assumes newest-first
+        ordering (see RECENT_REVIEWS_URL) and that the known reviews already
+        cover every older page the caller wants.
+
+        When paging runs to the end without stopping at a known review,
+        `on_complete(pages, exhausted)` is called with the number of leading
+        pages fetched without a failure and whether the product ran out of
+        pages before `max_pages` with none failing.
+        """
+        if concurrent:
+            pages = self._iter_pages_concurrently(product_id, max_pages, max_retries)
+        else:
+            pages = self._iter_pages(product_id, max_pages, max_retries)
+
+        pages_seen = 0
+        covered = 0
         try:
-            category = soup.find("a", {"class": "a-link-normal a-color-tertiary"})
-            return category.text.strip() if category else "Unknown"
-        except:
-            return "Unknown"
+            for page_reviews in pages:
+                pages_seen += 1
+                if page_reviews is None:
+                    page_reviews = []
+                elif covered == pages_seen - 1:
+                    covered = pages_seen
+                if is_known is None:
+                    yield page_reviews
+                    continue
+                new_reviews = [review for review in page_reviews if not is_known(review)]
+                if stop_at_known and len(new_reviews) < len(page_reviews):
+                    if new_reviews:
+                        yield new_reviews
+                    return
+                yield new_reviews
+        finally:
+            pages.close()
+        if on_complete is not None:
+            on_complete(covered, pages_seen < max_pages and covered == pages_seen)
+
+    def _iter_pages(self, product_id, max_pages, max_retries):
+        for page in range(1, max_pages + 1):
+            page_reviews = self._fetch_and_parse(product_id, page, max_retries)
+            if page_reviews is not None and not page_reviews:
+                break
+            yield page_reviews
+
+    def _iter_pages_concurrently(self, product_id, max_pages, max_retries):
+        """Fetch pages on a bounded thread pool, yielding them in page order"""
+        pages = iter(range(1, max_pages + 1))
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit_next():
+                page = next(pages, None)
+                if page is not None:
+                    in_flight[page] = executor.submit(self._fetch_and_parse, product_id, page, max_retries)
+
+            try:
+                for _ in range(self.max_workers):
+                    submit_next()
+
+                page = 1
+                while page in in_flight:
+                    page_reviews = in_flight.pop(page).result()
+                    if page_reviews is not None and not page_reviews:
+                        break
+                    submit_next()
+                    yield page_reviews
+                    page += 1
+            finally:
+                # Later pages are no longer needed: drop the ones that haven't
+                # started. Leaving the executor still waits for those in flight.
+                for future in in_flight.values():
+                    future.cancel()
+
+    def _fetch_and_parse(self, product_id, page, max_retries):
+        content = self._fetch_page(product_id, page, max_retries)
+        if content is None:
+            return None
+        try:
+            with metrics.span("collector.parse"):
+                reviews = self.parser.parse(content)
+        except Exception as e:
+            # A page we can't parse is treated like one we couldn't fetch
+            self.logger.error(f"Failed to parse page {page} with {self.parser.name}: {e}")
+            metrics.count("collector.failed_pages")
+            return None
+        metrics.count("collector.pages")
+        metrics.count("collector.reviews", len(reviews))
+        return reviews
+
+    def _fetch_page(self, product_id, page, max_retries):
+        """Fetch one review page, returning None once retries are exhausted"""
+        url = self.base_url.format(product_id=product_id, page=page)
+        limiter = self._limiter_for(url)
+        for attempt in range(max_retries):
+            try:
+                with metrics.span("collector.rate_limit_wait"):
+                    limiter.acquire()
+                with metrics.span("collector.http_get"):
+                    response = self.session.get(url, timeout=10)
+                response.raise_for_status()  # Raise exception for bad status codes
+                return response.content
+            except requests.RequestException as e:
+                if attempt + 1 == max_retries:
+                    self.logger.error(f"Failed to fetch page {page} after {max_retries} attempts: {e}")
+                    metrics.count("collector.failed_pages")
+                else:
+                    metrics.count("collector.retries")
+                    with metrics.span("collector.backoff_sleep"):
+                        time.sleep(self._backoff_delay(attempt))
+        return None
+
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _limiter_for(self, url):
+        host = urlparse(url).netloc
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = TokenBucket(self.requests_per_second, self.burst)
+            return self._limiters[host]
 
     def save_reviews(self, reviews_df, output_path):
         reviews_df.to_csv(output_path, index=False)
@@ -0,0 +1,195 @@
+import hashlib
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import metrics
+
+class ReviewDeduplicator:
+    """Groups exact and near-duplicate reviews so each group is scored once.
+
+    Reviews are compared on their preprocessed tokens: identical token
+    sequences share a cluster through an exact hash, and the rest are
+    matched with MinHash signatures over word shingles, bucketed by LSH
+    bands and confirmed when the estimated Jaccard similarity reaches
+    `threshold`. Only the first review of a cluster (its representative) is
+    indexed and scored; later members reuse its result. State persists
+    across calls, so duplicates arriving on later pages are still caught.
+
+    Reviews with fewer than `min_tokens` tokens are never matched on their
+    tokens: "great product" from two customers is two opinions, not a copy.
+    Callers can pass `identities` as well, and texts that share one are
+    merged at any length. The merge is only as precise as the identity:
+    the app uses ReviewStore.review_hash (text plus date), so two customers
+    posting the same short text on the same day are merged along with
+    scrape repeats.
+    """
+
+    _PRIME = (1 << 61) - 1
+    _MAX_BLOCK_SHINGLES = 32768
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle_size=3, min_tokens=5, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+
+        # a < 2**31 and crc32 hashes < 2**32 keep a * x + b inside uint64
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+        self._exact = {}
+        self._identities = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = []
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self._results = None
+
+    @property
+    def clusters(self):
+        return len(self._signatures)
+
+    @metrics.timed("dedup.assign")
+    def assign(self, processed_texts, identities=None):
+        """Return (cluster id per text, mask of texts that start a new cluster)
+
+        `identities`, aligned with the texts, merges texts with the same
+        identity whatever their length.
+        """
+        texts = pd.Series(processed_texts, dtype=object).fillna('').astype(str)
+        if identities is None:
+            identities = [None] * len(texts)
+        tokens = [text.split() for text in texts]
+        keys = [
+            self._exact_key(words) if len(words) >= self.min_tokens else None
+            for words in tokens
+        ]
+
+        pending = {}
+        for i, key in enumerate(keys):
+            if key is not None and key not in self._exact and key not in pending:
+                pending[key] = i
+        signatures = dict(zip(pending, self._signatures_for([tokens[i] for i in pending.values()])))
+
+        clusters = np.empty(len(texts), dtype=np.int64)
+        new = np.zeros(len(texts), dtype=bool)
+        for i, (key, identity) in enumerate(zip(keys, identities)):
+            if identity is not None and identity in self._identities:
+                cluster = self._identities[identity]
+            elif key is None:
+                cluster = self._add_cluster(None)
+                new[i] = True
+            else:
+                cluster = self._exact.get(key)
+                if cluster is None:
+                    signature = signatures[key]
+                    cluster = self._match(signature)
+                    if cluster is None:
+                        cluster = self._add_cluster(signature)
+                        new[i] = True
+                    self._exact[key] = cluster
+            if identity is not None:
+                self._identities.setdefault(identity, cluster)
+            clusters[i] = cluster
+
+        sizes = np.zeros(self.clusters, dtype=np.int64)
+        sizes[:len(self._sizes)] = self._sizes
+        self._sizes = sizes + np.bincount(clusters, minlength=self.clusters)
+
+        metrics.count("dedup.rows", len(texts))
+        metrics.count("dedup.duplicates", int(len(texts) - new.sum()))
+        return clusters, new
+
+    def score(self, processed_texts, analyzer=None, results=None, identities=None):
+        """Score one representative per cluster and fan the results out to every text.
+
+        Pass `results` (aligned with the texts) instead of an analyzer for
+        reviews that are already scored; `identities` is passed to assign.
+        The returned frame has the analyzer
+        columns plus `cluster`, `duplicate_count` (cluster size so far) and
+        `is_duplicate` (False for the representative).
+        """
+        texts = pd.Series(processed_texts, dtype=object).fillna('').astype(str).reset_index(drop=True)
+        clusters, new = self.assign(texts, identities)
+        if new.any():
+            if results is not None:
+                computed = results.reset_index(drop=True)[new].reset_index(drop=True)
+            else:
+                computed = analyzer.analyze_batch(texts[new])
+            self._add_results(computed)
+
+        fanned = self._results.iloc[clusters].reset_index(drop=True)
+        fanned['cluster'] = clusters
+        fanned['duplicate_count'] = self._sizes[clusters]
+        fanned['is_duplicate'] = ~new
+        return fanned
+
+    def _exact_key(self, words):
+        return hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=16).digest()
+
+    def _shingles(self, words):
+        n = self.shingle_size
+        if len(words) <= n:
+            return [zlib.crc32(" ".join(words).encode("utf-8"))]
+        return [zlib.crc32(" ".join(words[i:i + n]).encode("utf-8")) for i in range(len(words) - n + 1)]
+
+    def _signatures_for(self, token_lists):
+        """MinHash signatures (num_perm uint64 each), computed in blocks to bound memory"""
+        signatures = []
+        block, block_size = [], 0
+        for words in token_lists:
+            shingles = self._shingles(words)
+            if block and block_size + len(shingles) > self._MAX_BLOCK_SHINGLES:
+                signatures.extend(self._minhash_block(block))
+                block, block_size = [], 0
+            block.append(shingles)
+            block_size += len(shingles)
+        if block:
+            signatures.extend(self._minhash_block(block))
+        return signatures
+
+    def _minhash_block(self, block):
+        lengths = np.fromiter((len(shingles) for shingles in block), dtype=np.int64, count=len(block))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        hashes = np.fromiter(
+            (value for shingles in block for value in shingles), dtype=np.uint64, count=int(lengths.sum())
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % np.uint64(self._PRIME)
+        return list(np.minimum.reduceat(permuted, starts, axis=0))
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _match(self, signature):
+        """Most similar indexed representative at or above the threshold, if any"""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            cluster = bucket.get(key)
+            if cluster is not None:
+                candidates.add(cluster)
+        best, best_similarity = None, self.threshold
+        for cluster in candidates:
+            similarity = np.count_nonzero(self._signatures[cluster] == signature) / self.num_perm
+            if similarity >= best_similarity:
+                best, best_similarity = cluster, similarity
+        return best
+
+    def _add_cluster(self, signature):
+        cluster = len(self._signatures)
+        self._signatures.append(signature)
+        if signature is not None:
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(key, cluster)
+        return cluster
+
+    def _add_results(self, computed):
+        if self._results is None:
+            self._results = computed.reset_index(drop=True)
+        else:
+            self._results = pd.concat([self._results, computed], ignore_index=True)
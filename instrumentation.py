@@ -0,0 +1,127 @@
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+class _NullSpan:
+    """Shared do-nothing span handed out while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics._record(self.name, time.perf_counter() - self.started)
+        return False
+
+class Metrics:
+    """Process-wide timing spans and counters for the analysis hot path.
+
+    Disabled by default: `span()` then returns a shared no-op context
+    manager and `count()` returns immediately, so instrumented code pays
+    one attribute check per call. Spans are aggregated by name (calls,
+    total and max seconds); nested spans each record their own wall time.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name):
+        """Decorator form of span() timing every call of a function"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def _record(self, name, seconds):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                self._spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "started": self.started,
+                "spans": {
+                    name: {"calls": calls, "total_s": total, "max_s": longest}
+                    for name, (calls, total, longest) in sorted(self._spans.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self, snapshot=None):
+        return json.dumps(snapshot or self.snapshot(), indent=2)
+
+    def to_prometheus(self, snapshot=None):
+        """Render the current values (or a saved snapshot) in the Prometheus text format"""
+        snapshot = snapshot or self.snapshot()
+        lines = []
+        families = [
+            ("sentiment_span_seconds_total", "counter", lambda stats: f"{stats['total_s']:.6f}"),
+            ("sentiment_span_calls_total", "counter", lambda stats: stats['calls']),
+            ("sentiment_span_seconds_max", "gauge", lambda stats: f"{stats['max_s']:.6f}"),
+        ]
+        for metric, kind, value in families:
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, stats in snapshot["spans"].items():
+                lines.append(f'{metric}{{span="{name}"}} {value(stats)}')
+        for name, value in snapshot["counters"].items():
+            metric = "sentiment_" + re.sub(r"[^a-zA-Z0-9_]", "_", name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write JSON, or Prometheus text for `.prom`/`.txt` paths"""
+        content = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w") as f:
+            f.write(content)
+
+# Shared by every module; SENTIMENT_METRICS=1 turns it on at startup.
+metrics = Metrics(enabled=os.environ.get("SENTIMENT_METRICS", "") not in ("", "0"))
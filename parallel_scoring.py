@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from preprocessor import TextPreprocessor
+from sentiment_analyzer import SentimentAnalyzer
+
+# Per-process state, filled in once by the pool initializer
+_worker = {}
+
+def _init_worker(model_type, batch_size, preprocess):
+    _worker['preprocessor'] = TextPreprocessor() if preprocess else None
+    _worker['analyzer'] = SentimentAnalyzer(model_type=model_type, batch_size=batch_size)
+
+def _score_shard(texts):
+    preprocessor = _worker['preprocessor']
+    if preprocessor is None:
+        return _worker['analyzer'].analyze_batch(texts)
+    processed = preprocessor.preprocess_batch(texts)
+    results = _worker['analyzer'].analyze_batch(processed)
+    results.insert(0, 'processed_text', processed)
+    return results
+
+class ParallelScorer:
+    """Shard texts across a process pool where each worker holds its own analyzer.
+
+    VADER scoring is pure Python and GIL-bound, so separate processes are
+    the only way to use more than one core. Results come back in input order.
+    """
+
+    def __init__(self, model_type="vader", workers=None, chunk_size=5000, batch_size=32, preprocess=True):
+        self.model_type = model_type
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.preprocess = preprocess
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_type, self.batch_size, self.preprocess)
+            )
+        return self._executor
+
+    def iter_scores(self, texts):
+        """Yield one analyze_batch result per shard of `chunk_size` texts, in order.
+
+        At most two shards per worker are in flight, so memory stays bounded
+        even when `texts` is a long-running iterator.
+        """
+        executor = self._pool()
+        pending = []
+        shard = []
+        max_in_flight = self.workers * 2
+
+        for text in texts:
+            shard.append(text)
+            if len(shard) == self.chunk_size:
+                pending.append(executor.submit(_score_shard, shard))
+                shard = []
+                if len(pending) >= max_in_flight:
+                    yield pending.pop(0).result()
+        if shard:
+            pending.append(executor.submit(_score_shard, shard))
+        for future in pending:
+            yield future.result()
+
+    def score_frame(self, df, text_column='review_text'):
+        """Return `df` with the analyzer's result columns appended"""
+        if df.empty:
+            return df.copy()
+        results = pd.concat(list(self.iter_scores(df[text_column].tolist())), ignore_index=True)
+        results.index = df.index
+        return pd.concat([df, results], axis=1)
@@ -1,35 +1,117 @@
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import pandas as pd
+from resources import registry
+from instrumentation import metrics
+
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+# Once everything but letters and whitespace is stripped, the only thing
+# word_tokenize still does beyond a whitespace split is break up these
+# Treebank contractions.
+TREEBANK_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+_worker_preprocessor = None
+
+def _init_worker():
+    global _worker_preprocessor
+    _worker_preprocessor = TextPreprocessor()
+
+def _preprocess_chunk(texts):
+    return [_worker_preprocessor._preprocess_fast(text) for text in texts]
 
 class TextPreprocessor:
+    # Identifies the preprocessing steps below; bump it whenever they change
+    # so cached sentiment results for old outputs are not reused.
+    config_id = "lower|alpha-only|word-tokenize|stopwords-english|wordnet-lemma|v1"
+
+    LEMMA_CACHE_SIZE = 100000
+    PARALLEL_THRESHOLD = 50000
+
     def __init__(self):
+        self._lemmatize = None
+
+    @property
+    def lemmatizer(self):
+        return self._load('lemmatizer')
+
+    @property
+    def stop_words(self):
+        return self._load('stopwords')
+
+    def _load(self, name):
         try:
-            for resource in ['stopwords', 'punkt', 'wordnet']:
-                try:
-                    nltk.data.find(f'tokenizers/{resource}')
-                except LookupError:
-                    nltk.download(resource, quiet=True)
-            self.lemmatizer = WordNetLemmatizer()
-            self.stop_words = set(stopwords.words('english'))
+            return registry.get(name)
         except Exception as e:
             raise RuntimeError(f"Failed to initialize NLTK resources: {e}")
 
+    def warm_up(self):
+        """Load the NLTK data used by preprocessing ahead of the first review"""
+        for name in ['stopwords', 'lemmatizer', 'punkt']:
+            self._load(name)
+
+    @metrics.timed("preprocessor.preprocess")
     def preprocess(self, text):
         # Convert to lowercase
         text = text.lower()
-        
+
         # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        
+        text = NON_ALPHA_PATTERN.sub('', text)
+
         # Tokenization
+        self._load('punkt')
+        from nltk.tokenize import word_tokenize
         tokens = word_tokenize(text)
-        
+
         # Remove stopwords and lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) 
-                 for token in tokens 
-                 if token not in self.stop_words]
-        
+        lemmatizer = self.lemmatizer
+        stop_words = self.stop_words
+        tokens = [lemmatizer.lemmatize(token)
+                 for token in tokens
+                 if token not in stop_words]
+
         return " ".join(tokens)
+
+    @metrics.timed("preprocessor.preprocess_batch")
+    def preprocess_batch(self, texts, n_jobs=None, chunk_size=5000):
+        """Preprocess many texts with the same output as `preprocess`.
+
+        Each distinct text is processed once. Pass `n_jobs` to spread inputs
+        larger than PARALLEL_THRESHOLD over a process pool.
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        texts = pd.Series(list(texts), dtype=object).fillna('').astype(str)
+        codes, uniques = pd.factorize(texts)
+        metrics.count("preprocessor.rows", len(texts))
+        metrics.count("preprocessor.unique_rows", len(uniques))
+
+        if n_jobs and n_jobs > 1 and len(uniques) >= self.PARALLEL_THRESHOLD:
+            chunks = [uniques[i:i + chunk_size] for i in range(0, len(uniques), chunk_size)]
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+                processed = [text for chunk in executor.map(_preprocess_chunk, chunks) for text in chunk]
+        else:
+            processed = [self._preprocess_fast(text) for text in uniques]
+
+        results = [processed[code] for code in codes]
+        if index is not None:
+            return pd.Series(results, index=index, dtype=object)
+        return results
+
+    def _preprocess_fast(self, text):
+        tokens = []
+        for token in NON_ALPHA_PATTERN.sub('', text.lower()).split():
+            tokens.extend(TREEBANK_SPLITS.get(token, (token,)))
+
+        stop_words = self.stop_words
+        if self._lemmatize is None:
+            self._lemmatize = lru_cache(maxsize=self.LEMMA_CACHE_SIZE)(self.lemmatizer.lemmatize)
+        lemmatize = self._lemmatize
+        return " ".join([lemmatize(token) for token in tokens if token not in stop_words])
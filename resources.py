@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+
+# nltk.data.find paths for the corpora and models we depend on
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'punkt': 'tokenizers/punkt',
+    'wordnet': 'corpora/wordnet',
+}
+
+class ResourceRegistry:
+    """Process-wide registry of lazily loaded, shared resources.
+
+    Each resource is built by its factory on first `get` and reused by every
+    caller afterwards. Loading is guarded by a per-resource lock so concurrent
+    Streamlit sessions never load the same model twice.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.load_times = {}
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"Unknown resource: {name}")
+
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.load_times[name] = time.perf_counter() - start
+                logging.info(f"Loaded resource {name} in {self.load_times[name]:.2f}s")
+        return self._instances[name]
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def warm_up(self, names=None):
+        """Load the given resources (all registered ones by default) ahead of first use"""
+        for name in names or list(self._factories):
+            self.get(name)
+        return dict(self.load_times)
+
+    def clear(self, name=None):
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self.load_times.clear()
+            else:
+                self._instances.pop(name, None)
+                self.load_times.pop(name, None)
+
+def ensure_nltk_resource(resource):
+    import nltk
+    try:
+        nltk.data.find(NLTK_RESOURCES[resource])
+    except LookupError:
+        nltk.download(resource, quiet=True)
+
+def _load_stopwords():
+    ensure_nltk_resource('stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+def _load_lemmatizer():
+    ensure_nltk_resource('wordnet')
+    from nltk.stem import WordNetLemmatizer
+    lemmatizer = WordNetLemmatizer()
+    # WordNet itself is only read on the first lemmatize call.
+    lemmatizer.lemmatize('reviews')
+    return lemmatizer
+
+def _load_punkt():
+    ensure_nltk_resource('punkt')
+    return True
+
+def _load_vader():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+def _load_bert():
+    from bert_backends import load_pipeline
+    return load_pipeline()
+
+def _load_bert_int8():
+    from bert_backends import load_quantized
+    return load_quantized()
+
+def _load_bert_onnx():
+    from bert_backends import load_onnx
+    return load_onnx()
+
+registry = ResourceRegistry()
+registry.register('stopwords', _load_stopwords)
+registry.register('lemmatizer', _load_lemmatizer)
+registry.register('punkt', _load_punkt)
+registry.register('vader', _load_vader)
+registry.register('bert', _load_bert)
+registry.register('bert-int8', _load_bert_int8)
+registry.register('bert-onnx', _load_bert_onnx)
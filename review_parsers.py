@@ -0,0 +1,127 @@
+import logging
+
+import pandas as pd
+
+REVIEW_DATE_FORMAT = '%B %d, %Y'
+CATEGORY_CLASS = 'a-link-normal a-color-tertiary'
+
+def build_reviews(texts, raw_dates, category):
+    """Turn one page's extracted fields into review rows, parsing all dates in one step"""
+    if not texts:
+        return []
+    dates = pd.to_datetime(
+        [raw.split('on ')[-1] for raw in raw_dates],
+        format=REVIEW_DATE_FORMAT,
+        errors='coerce'
+    )
+    if dates.isna().any():
+        logging.warning(f"Could not parse {int(dates.isna().sum())} review dates on page")
+    return [
+        {'review_text': text, 'date': date, 'category': category}
+        for text, date in zip(texts, dates)
+    ]
+
+class SoupReviewParser:
+    """BeautifulSoup backend; `features` picks the tree builder ('html.parser' or 'lxml')"""
+
+    def __init__(self, features='html.parser'):
+        self.features = features
+        self.name = f"bs4[{features}]"
+
+    def parse(self, content):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(content, self.features)
+        category = soup.find("a", {"class": CATEGORY_CLASS})
+        category = category.text.strip() if category else "Unknown"
+
+        texts = []
+        raw_dates = []
+        for review in soup.find_all('div', {'data-hook': 'review'}):
+            review_text = review.find('span', {'data-hook': 'review-body'})
+            review_date = review.find('span', {'data-hook': 'review-date'})
+            if review_text and review_date:
+                texts.append(review_text.text.strip())
+                raw_dates.append(review_date.text)
+        return build_reviews(texts, raw_dates, category)
+
+class LxmlReviewParser:
+    """libxml2 backend walking the tree with compiled XPath expressions"""
+
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import etree
+        self._reviews = etree.XPath('//div[@data-hook="review"]')
+        self._body = etree.XPath('.//span[@data-hook="review-body"]')
+        self._date = etree.XPath('.//span[@data-hook="review-date"]')
+        self._category = etree.XPath(f'//a[@class="{CATEGORY_CLASS}"]')
+
+    def parse(self, content):
+        import lxml.html
+        from lxml import etree
+        if isinstance(content, bytes):
+            # libxml2 assumes Latin-1 for pages without a charset declaration.
+            try:
+                content = content.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+        # fromstring raises on a document without elements (blank, or only a
+        # comment); other backends see a page without reviews
+        try:
+            root = lxml.html.fromstring(content)
+        except etree.ParserError:
+            return []
+        category = self._category(root)
+        category = category[0].text_content().strip() if category else "Unknown"
+
+        texts = []
+        raw_dates = []
+        for review in self._reviews(root):
+            review_text = self._body(review)
+            review_date = self._date(review)
+            if review_text and review_date:
+                texts.append(review_text[0].text_content().strip())
+                raw_dates.append(review_date[0].text_content())
+        return build_reviews(texts, raw_dates, category)
+
+class SelectolaxReviewParser:
+    """Lexbor (selectolax) backend, the fastest option when installed"""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, content):
+        tree = self._parser(content)
+        category = tree.css_first(f'a[class="{CATEGORY_CLASS}"]')
+        category = category.text().strip() if category else "Unknown"
+
+        texts = []
+        raw_dates = []
+        for review in tree.css('div[data-hook="review"]'):
+            review_text = review.css_first('span[data-hook="review-body"]')
+            review_date = review.css_first('span[data-hook="review-date"]')
+            if review_text and review_date:
+                texts.append(review_text.text().strip())
+                raw_dates.append(review_date.text())
+        return build_reviews(texts, raw_dates, category)
+
+PARSER_BACKENDS = {
+    'html.parser': lambda: SoupReviewParser('html.parser'),
+    'bs4-lxml': lambda: SoupReviewParser('lxml'),
+    'lxml': LxmlReviewParser,
+    'selectolax': SelectolaxReviewParser,
+}
+
+def get_parser(backend='auto'):
+    """Return a review page parser; 'auto' picks the fastest installed backend"""
+    if backend != 'auto':
+        return PARSER_BACKENDS[backend]()
+    for name in ['selectolax', 'lxml']:
+        try:
+            return PARSER_BACKENDS[name]()
+        except ImportError:
+            continue
+    return PARSER_BACKENDS['html.parser']()
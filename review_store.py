@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+class ReviewStore:
+    """SQLite store of scraped reviews and their per-model sentiment, keyed by product.
+
+    Reviews are identified by a hash of their text and date so re-scraped
+    pages map onto the rows we already have, letting the collector stop at
+    the first known review and the analyzer score only what is new. The
+    depth of the last full crawl is kept per product, so that shortcut is
+    only taken once the stored reviews reach as deep as the caller asks.
+    """
+
+    DEFAULT_PATH = os.path.join(
+        os.path.expanduser("~"), ".cache", "sentiment_analysis", "reviews.sqlite"
+    )
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS reviews (
+                    product_id TEXT NOT NULL,
+                    review_hash TEXT NOT NULL,
+                    review_text TEXT NOT NULL,
+                    date TEXT,
+                    category TEXT,
+                    processed_text TEXT,
+                    first_seen REAL NOT NULL,
+                    PRIMARY KEY (product_id, review_hash)
+                );
+                CREATE TABLE IF NOT EXISTS sentiments (
+                    product_id TEXT NOT NULL,
+                    review_hash TEXT NOT NULL,
+                    model_key TEXT NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    PRIMARY KEY (product_id, review_hash, model_key)
+                );
+                CREATE TABLE IF NOT EXISTS crawls (
+                    product_id TEXT PRIMARY KEY,
+                    pages INTEGER NOT NULL,
+                    complete INTEGER NOT NULL,
+                    updated REAL NOT NULL
+                );
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def review_hash(review):
+        """Identity of a review dict/row: its text plus its date.
+
+        Pages carry no reviewer or rating we parse, so identical reviews
+        posted on the same day by different customers share an identity.
+        """
+        date = review.get('date')
+        date = "" if date is None or pd.isna(date) else pd.Timestamp(date).date().isoformat()
+        digest = hashlib.sha256(str(review.get('review_text', '')).encode("utf-8"))
+        digest.update(b"\0" + date.encode("ascii"))
+        return digest.hexdigest()
+
+    def known_hashes(self, product_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT review_hash FROM reviews WHERE product_id = ?", (product_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def covers_pages(self, product_id, max_pages):
+        """Whether stored reviews reach at least `max_pages` deep (or to the product's last page)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pages, complete FROM crawls WHERE product_id = ?", (product_id,)
+            ).fetchone()
+        return row is not None and (bool(row[1]) or row[0] >= max_pages)
+
+    def save_crawl(self, product_id, pages, complete):
+        """Record how many leading pages a full crawl fetched without a failure"""
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO crawls (product_id, pages, complete, updated) VALUES (?, ?, ?, ?)",
+                    (product_id, pages, int(complete), time.time())
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logging.warning(f"Failed to store crawl depth for {product_id}: {e}")
+
+    def save_reviews(self, product_id, reviews_df, model_key=None):
+        """Store reviews, plus their processed text and sentiment when those columns exist"""
+        if reviews_df.empty:
+            return
+        now = time.time()
+        review_rows = []
+        sentiment_rows = []
+        for review in reviews_df.to_dict('records'):
+            review_hash = self.review_hash(review)
+            date = review.get('date')
+            review_rows.append((
+                product_id, review_hash, review['review_text'],
+                None if date is None or pd.isna(date) else pd.Timestamp(date).isoformat(),
+                review.get('category'), review.get('processed_text'), now
+            ))
+            if model_key is not None and review.get('sentiment') is not None:
+                sentiment_rows.append((product_id, review_hash, model_key, review['sentiment']))
+
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT INTO reviews (product_id, review_hash, review_text, date, category, "
+                    "processed_text, first_seen) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (product_id, review_hash) DO UPDATE SET "
+                    "processed_text = COALESCE(excluded.processed_text, reviews.processed_text)",
+                    review_rows
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sentiments (product_id, review_hash, model_key, sentiment) "
+                    "VALUES (?, ?, ?, ?)",
+                    sentiment_rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logging.warning(f"Failed to store reviews for {product_id}: {e}")
+
+    def load_reviews(self, product_id, model_key=None):
+        """Return every stored review of a product, with its sentiment under `model_key` if scored"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT r.review_hash, r.review_text, r.date, r.category, r.processed_text, "
+                "s.sentiment FROM reviews r LEFT JOIN sentiments s "
+                "ON s.product_id = r.product_id AND s.review_hash = r.review_hash AND s.model_key = ? "
+                "WHERE r.product_id = ? ORDER BY r.date DESC",
+                self._conn, params=(model_key, product_id)
+            )
+        df['date'] = pd.to_datetime(df['date'])
+        return df
@@ -0,0 +1,79 @@
+from collections import Counter
+
+import pandas as pd
+
+class SentimentRollup:
+    """Incremental review counts per (product, category, sentiment, period).
+
+    Chunks are folded in as they are scored, so charts can be drawn from
+    tables whose size depends on the number of periods and categories
+    rather than on the number of reviews.
+    """
+
+    GRANULARITIES = {
+        'day': 'D',
+        'week': 'W',
+        'month': 'M',
+    }
+
+    def __init__(self):
+        self._counts = {granularity: Counter() for granularity in self.GRANULARITIES}
+        self._totals = Counter()
+
+    def add(self, df, product_id=None):
+        """Fold a scored chunk (date, category, sentiment columns) into the rollups"""
+        if df.empty:
+            return
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        categories = df['category'].fillna('Unknown') if 'category' in df.columns else 'Unknown'
+        frame = pd.DataFrame({
+            'category': categories,
+            'sentiment': df['sentiment'].values
+        }, index=df.index)
+
+        totals = frame.groupby(['category', 'sentiment'], observed=True).size()
+        for (category, sentiment), count in totals.items():
+            self._totals[(product_id, category, sentiment)] += int(count)
+
+        dated = frame[dates.notna()]
+        dates = dates[dates.notna()]
+        for granularity, freq in self.GRANULARITIES.items():
+            periods = dates.dt.to_period(freq).dt.start_time
+            grouped = dated.groupby([periods, dated['category'], dated['sentiment']], observed=True).size()
+            for (period, category, sentiment), count in grouped.items():
+                self._counts[granularity][(product_id, category, sentiment, period)] += int(count)
+
+    def sentiment_counts(self, product_id=None):
+        """Total reviews per sentiment"""
+        counts = Counter()
+        for (product, _, sentiment), count in self._totals.items():
+            if product_id is None or product == product_id:
+                counts[sentiment] += count
+        return pd.Series(counts, dtype=int).sort_values(ascending=False)
+
+    def category_table(self, product_id=None):
+        """Reviews per category (rows) and sentiment (columns)"""
+        rows = [
+            (category, sentiment, count)
+            for (product, category, sentiment), count in self._totals.items()
+            if product_id is None or product == product_id
+        ]
+        return self._pivot(rows, 'category')
+
+    def trend_table(self, granularity='day', product_id=None):
+        """Reviews per period start (rows) and sentiment (columns)"""
+        rows = [
+            (period, sentiment, count)
+            for (product, _, sentiment, period), count in self._counts[granularity].items()
+            if product_id is None or product == product_id
+        ]
+        return self._pivot(rows, 'date')
+
+    @staticmethod
+    def _pivot(rows, index):
+        if not rows:
+            return pd.DataFrame()
+        table = pd.DataFrame(rows, columns=[index, 'sentiment', 'count'])
+        return table.pivot_table(
+            index=index, columns='sentiment', values='count', aggfunc='sum', fill_value=0
+        ).sort_index()
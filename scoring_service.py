@@ -0,0 +1,395 @@
+"""Long-lived local HTTP service that scores reviews with one warm model.
+
+    python scoring_service.py --model bert --port 8765
+
+Endpoints (JSON in, JSON out):
+
+    POST /score       {"text": "..."}        -> {"sentiment": ..., "scores": {...}}
+    POST /score/bulk  {"texts": ["...", ...]} -> {"results": [...]}
+    GET  /stats                               -> per-endpoint latency and batching stats
+    GET  /health
+
+Concurrent requests are coalesced into micro-batches before they reach the
+analyzer, and requests are rejected with 503 once the queue is full.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from preprocessor import TextPreprocessor
+from sentiment_analyzer import BERT_MODEL_TYPES, SentimentAnalyzer, score_floats
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+SCORE_COLUMNS = ["neg", "neu", "pos", "compound", "score"]
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class Overloaded(Exception):
+    """Raised when the scoring queue is full"""
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class LatencyStats:
+    """Request count, errors and latency percentiles over the most recent requests"""
+
+    def __init__(self, window=2048):
+        self.count = 0
+        self.errors = 0
+        self._recent = deque(maxlen=window)
+
+    def record(self, seconds, error=False):
+        self.count += 1
+        self.errors += int(error)
+        self._recent.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self._recent)
+        def pct(p):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))] * 1000
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+        }
+
+class MicroBatcher:
+    """Coalesce queued scoring jobs into batches of up to `max_batch_size` texts.
+
+    A batch is dispatched as soon as it is full or `max_wait` seconds after
+    its first job arrived, whichever comes first, so a lone request waits at
+    most `max_wait` while bursts fill the model's batches. Jobs larger than
+    a batch run on their own. Scoring happens on a single worker thread so
+    the model is never used concurrently.
+    """
+
+    def __init__(self, score_fn, max_batch_size=32, max_wait=0.005, max_queue=1024):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self._task = None
+        self.batches = 0
+        self.batched_texts = 0
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def submit(self, texts):
+        """Score `texts` as part of a shared batch; raises Overloaded when the queue is full"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((texts, future))
+        except asyncio.QueueFull:
+            raise Overloaded(f"Scoring queue is full ({self._queue.maxsize} jobs)")
+        return await future
+
+    def stats(self):
+        return {
+            "queued_jobs": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        carry = None
+        while True:
+            jobs = [carry or await self._queue.get()]
+            carry = None
+            size = len(jobs[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    job = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if size + len(job[0]) > self.max_batch_size:
+                    # Don't overshoot the batch; this job opens the next one
+                    carry = job
+                    break
+                jobs.append(job)
+                size += len(job[0])
+
+            texts = [text for job_texts, _ in jobs for text in job_texts]
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_fn, texts)
+            except Exception as e:
+                for _, future in jobs:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.batched_texts += len(texts)
+
+            start = 0
+            for job_texts, future in jobs:
+                if not future.done():
+                    future.set_result(results[start:start + len(job_texts)])
+                start += len(job_texts)
+
+class ScoringService:
+    """asyncio HTTP/1.1 server around a shared TextPreprocessor + SentimentAnalyzer"""
+
+    def __init__(self, analyzer, preprocessor=None, max_batch_size=None, max_wait=0.005,
+                 max_queue=1024, max_bulk_texts=10000):
+        self.analyzer = analyzer
+        self.preprocessor = preprocessor
+        self.max_batch_size = max_batch_size or analyzer.batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.max_bulk_texts = max_bulk_texts
+        self.latency = {}
+        self.batcher = None
+        self._server = None
+        self.routes = {
+            ("POST", "/score"): self._score,
+            ("POST", "/score/bulk"): self._score_bulk,
+            ("GET", "/stats"): self._stats,
+            ("GET", "/health"): self._health,
+        }
+
+    def score_texts(self, texts):
+        """Preprocess and score a batch, returning one JSON-ready result per text"""
+        processed = self.preprocessor.preprocess_batch(texts) if self.preprocessor else texts
+        results = self.analyzer.analyze_batch(processed)
+        scores = {
+            column: score_floats(results[column])
+            for column in SCORE_COLUMNS if column in results.columns
+        }
+        return [
+            # NaN marks a score the row's model doesn't produce
+            {"sentiment": sentiment, "scores": {k: values[i] for k, values in scores.items() if values[i] == values[i]}}
+            for i, sentiment in enumerate(results['sentiment'].astype(str))
+        ]
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start listening; returns the bound port (useful with port=0)"""
+        self.batcher = MicroBatcher(self.score_texts, self.max_batch_size, self.max_wait, self.max_queue)
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.batcher is not None:
+            await self.batcher.close()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                started = time.perf_counter()
+                status, payload = await self._dispatch(method, path, body)
+                if (method, path) in self.routes:
+                    self.latency.setdefault(path, LatencyStats()).record(
+                        time.perf_counter() - started, error=status >= 400
+                    )
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Malformed Content-Length header")
+        if length < 0:
+            raise HTTPError(400, "Malformed Content-Length header")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, method, path, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {"error": f"{method} not allowed on {path}"}
+            return 404, {"error": f"No route for {path}"}
+        try:
+            payload = json.loads(body) if body else {}
+            return 200, await handler(payload)
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Overloaded as e:
+            return 503, {"error": str(e)}
+        except Exception as e:
+            logging.error(f"Scoring request failed: {e}")
+            return 500, {"error": str(e)}
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _score(self, payload):
+        text = payload.get("text") if isinstance(payload, dict) else None
+        if not isinstance(text, str):
+            raise HTTPError(400, 'Expected {"text": "<review>"}')
+        return (await self.batcher.submit([text]))[0]
+
+    async def _score_bulk(self, payload):
+        texts = payload.get("texts") if isinstance(payload, dict) else None
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise HTTPError(400, 'Expected {"texts": ["<review>", ...]}')
+        if len(texts) > self.max_bulk_texts:
+            raise HTTPError(413, f"At most {self.max_bulk_texts} texts per bulk request")
+        if not texts:
+            return {"results": []}
+        return {"results": await self.batcher.submit(texts)}
+
+    async def _stats(self, payload):
+        return {
+            "model": self.analyzer.model_key(),
+            "endpoints": {path: stats.summary() for path, stats in self.latency.items()},
+            "batching": self.batcher.stats(),
+        }
+
+    async def _health(self, payload):
+        return {"status": "ok"}
+
+class ScoringClient:
+    """Blocking client for a running ScoringService"""
+
+    def __init__(self, url="http://127.0.0.1:8765", timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def score(self, text):
+        return self._post("/score", {"text": text})
+
+    def score_bulk(self, texts):
+        return self._post("/score/bulk", {"texts": list(texts)})["results"]
+
+    def stats(self):
+        response = self.session.get(self.url + "/stats", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _post(self, path, payload):
+        response = self.session.post(self.url + path, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sentiment scoring over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", choices=["vader", *BERT_MODEL_TYPES], default="vader")
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="Largest micro-batch handed to the analyzer")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="How long a request may wait for others to share its batch")
+    parser.add_argument("--max-queue", type=int, default=1024,
+                        help="Queued requests before new ones are rejected with 503")
+    parser.add_argument("--no-preprocess", action="store_true",
+                        help="Score texts as given instead of running the TextPreprocessor first")
+    return parser.parse_args(argv)
+
+async def serve(args):
+    preprocessor = None
+    if not args.no_preprocess:
+        preprocessor = TextPreprocessor()
+        preprocessor.warm_up()
+    analyzer = SentimentAnalyzer(
+        model_type=args.model,
+        batch_size=args.batch_size,
+        preprocessing=preprocessor.config_id if preprocessor else ""
+    )
+    analyzer.warm_up()
+    service = ScoringService(
+        analyzer, preprocessor,
+        max_batch_size=args.batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        max_queue=args.max_queue
+    )
+    port = await service.start(args.host, args.port)
+    logging.info(f"Scoring with {analyzer.model_key()} on http://{args.host}:{port}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
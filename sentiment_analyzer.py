@@ -1,42 +1,146 @@
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from vaderSentiment.vaderSentiment import (
+    SentimentIntensityAnalyzer, SentiText, BOOSTER_DICT, NEGATE, SPECIAL_CASES,
+    C_INCR, N_SCALAR
+)
+import numpy as np
 import pandas as pd
 import logging
+from bert_backends import softmax
+from resources import registry
+from instrumentation import metrics
+
+# Transformer backends: fp32 PyTorch, dynamically quantized int8 and ONNX Runtime
+BERT_MODEL_TYPES = ("bert", "bert-int8", "bert-onnx")
+# How per-chunk probabilities of a long review are combined
+CHUNK_AGGREGATIONS = ("mean", "length-weighted", "max-magnitude")
+
+# Column types of analyze_batch results. VADER fills compound/pos/neg/neu,
+# BERT fills label/score/chunks.
+SENTIMENT_DTYPE = pd.CategoricalDtype(['negative', 'neutral', 'positive'])
+RESULT_DTYPES = {
+    'sentiment': SENTIMENT_DTYPE,
+    'label': 'category',
+    'compound': 'float32',
+    'pos': 'float32',
+    'neg': 'float32',
+    'neu': 'float32',
+    'score': 'float32',
+    'chunks': 'int32',
+}
+
+def typed_results(df):
+    """Cast analyze_batch result columns to their compact types"""
+    return df.astype({column: dtype for column, dtype in RESULT_DTYPES.items() if column in df.columns})
+
+def score_floats(values):
+    """Python floats for float32 scores at float32 precision (0.6369, not 0.636900007...)"""
+    return [float(np.format_float_positional(value)) for value in np.asarray(values, dtype=np.float32)]
+
+def to_arrow(results):
+    """Convert analyze_batch results to a pyarrow Table without copying the numeric columns.
+
+    Float and integer columns are wrapped in place and categorical columns
+    become dictionary arrays over their existing codes.
+    """
+    import pyarrow as pa
+    arrays = []
+    for column in results.columns:
+        values = results[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(values.cat.codes.to_numpy(), mask=(values.cat.codes == -1).to_numpy()),
+                pa.array(values.cat.categories.to_numpy())
+            ))
+        else:
+            arrays.append(pa.array(values.to_numpy()))
+    return pa.Table.from_arrays(arrays, names=list(results.columns))
 
 class SentimentAnalyzer:
-    def __init__(self, model_type="vader"):
+    def __init__(self, model_type="vader", batch_size=32, max_batch_tokens=8192, max_length=None,
+                 cache=None, preprocessing="", long_text="chunk", aggregation="mean", chunk_overlap=32):
+        if long_text not in ("chunk", "truncate"):
+            raise ValueError(f"long_text must be 'chunk' or 'truncate', not {long_text!r}")
+        if aggregation not in CHUNK_AGGREGATIONS:
+            raise ValueError(f"aggregation must be one of {CHUNK_AGGREGATIONS}, not {aggregation!r}")
+        if chunk_overlap < 0:
+            raise ValueError(f"chunk_overlap must not be negative, not {chunk_overlap}")
         self.model_type = model_type
+        self.long_text = long_text
+        self.aggregation = aggregation
+        self.chunk_overlap = chunk_overlap
+        self.cache = cache
+        self.preprocessing = preprocessing
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_length = max_length
+        self._fast_vader = None
+        # Models come from the shared registry, so only the first analyzer
+        # of each type in the process pays for loading them.
         if model_type == "vader":
-            self.analyzer = SentimentIntensityAnalyzer()
-        elif model_type == "bert":
+            self.analyzer = registry.get('vader')
+        elif model_type in BERT_MODEL_TYPES:
             try:
-                from transformers import pipeline
-                self.analyzer = pipeline("sentiment-analysis")
+                self.analyzer = registry.get(model_type)
             except Exception as e:
-                logging.warning(f"Failed to load BERT model: {e}. Falling back to VADER.")
+                logging.warning(f"Failed to load {model_type} model: {e}. Falling back to VADER.")
                 self.model_type = "vader"
-                self.analyzer = SentimentIntensityAnalyzer()
+                self.analyzer = registry.get('vader')
+        if self.model_type in BERT_MODEL_TYPES and long_text == "chunk":
+            self._check_chunk_overlap()
+
+    def _check_chunk_overlap(self):
+        """Overflowing windows must advance, or the tokenizer fails on every long review"""
+        tokenizer = self.analyzer.tokenizer
+        window = self._bert_max_length() - tokenizer.num_special_tokens_to_add(pair=False)
+        if self.chunk_overlap >= window:
+            raise ValueError(
+                f"chunk_overlap ({self.chunk_overlap}) must be smaller than the {window} tokens "
+                f"a window holds besides special tokens (max_length {self._bert_max_length()})"
+            )
 
+    def warm_up(self):
+        """Run one tiny inference so the first real request doesn't pay for lazy setup"""
+        self.analyze_batch(["warm up"])
+
+    @metrics.timed("analyzer.analyze_text")
     def analyze_text(self, text):
+        if self.cache is None:
+            return self._analyze_text_uncached(text)
+
+        key = self.cache.make_key(self._cache_namespace("text"), text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.count("analyzer.cache_hits")
+            return cached
+        metrics.count("analyzer.cache_misses")
+        result = self._analyze_text_uncached(text)
+        if not result.get('fallback'):
+            self.cache.set(key, result)
+        return result
+
+    def _analyze_text_uncached(self, text):
         if self.model_type == "vader":
-            scores = self.analyzer.polarity_scores(text)
-            sentiment = self._get_vader_sentiment(scores['compound'])
+            return self._analyze_text_vader(text, self.analyzer)
+        try:
+            row = self._analyze_bert_batch([text], self.batch_size).iloc[0]
             return {
-                'sentiment': sentiment,
-                'scores': scores
+                'sentiment': row['sentiment'],
+                'scores': {'score': score_floats([row['score']])[0]}
             }
-        else:
-            try:
-                result = self.analyzer(text)[0]
-                sentiment = result['label'].lower()
-                return {
-                    'sentiment': 'positive' if sentiment == 'positive' else 'negative',
-                    'scores': {'score': result['score']}
-                }
-            except Exception as e:
-                logging.error(f"BERT analysis failed: {e}. Falling back to VADER.")
-                self.model_type = "vader"
-                self.analyzer = SentimentIntensityAnalyzer()
-                return self.analyze_text(text)
+        except Exception as e:
+            # Only this review falls back; the analyzer stays on BERT.
+            logging.error(f"BERT analysis failed: {e}. Scoring this review with VADER.")
+            metrics.count("analyzer.bert_fallbacks")
+            result = self._analyze_text_vader(text, registry.get('vader'))
+            result['fallback'] = True
+            return result
+
+    def _analyze_text_vader(self, text, vader):
+        scores = vader.polarity_scores(text)
+        return {
+            'sentiment': self._get_vader_sentiment(scores['compound']),
+            'scores': scores
+        }
 
     def _get_vader_sentiment(self, compound_score):
         if compound_score >= 0.05:
@@ -46,16 +150,380 @@ class SentimentAnalyzer:
         else:
             return 'neutral'
 
-    def analyze_batch(self, texts):
-        sentiments = []
-        scores = []
-        
-        for text in texts:
-            result = self.analyze_text(text)
-            sentiments.append(result['sentiment'])
-            scores.append(result['scores'])
-            
+    @metrics.timed("analyzer.analyze_batch")
+    def analyze_batch(self, texts, batch_size=None):
+        """Analyze many texts at once, returning one row per text in input order"""
+        texts = ["" if pd.isna(text) else str(text) for text in texts]
+        metrics.count("analyzer.rows", len(texts))
+        if self.cache is None or not texts:
+            return self._analyze_batch_uncached(texts, batch_size)
+
+        # "columns": rows cached before results were columnar carry a scores dict
+        namespace = self._cache_namespace("batch-columns")
+        keys = [self.cache.make_key(namespace, text) for text in texts]
+        found = self.cache.get_many(keys)
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        metrics.count("analyzer.cache_hits", len(texts) - len(pending))
+        metrics.count("analyzer.cache_misses", len(pending))
+
+        if pending:
+            computed = self._analyze_batch_uncached(list(pending.values()), batch_size)
+            new_rows = dict(zip(pending.keys(), computed.to_dict('records')))
+            # VADER stand-ins for a failed BERT batch must not be cached as BERT results
+            if not computed.attrs.get('fallback'):
+                self.cache.set_many(new_rows)
+            found.update(new_rows)
+
+        return typed_results(pd.DataFrame([found[key] for key in keys]))
+
+    def model_key(self):
+        """Identify the model, its revision and the preprocessing its inputs went through"""
+        key = f"{self.model_type}|{self._model_revision()}|{self.preprocessing}"
+        if self.model_type in BERT_MODEL_TYPES:
+            # Long-review handling changes BERT results, so it is part of the key
+            if self.long_text == "chunk":
+                key += f"|chunk-{self.aggregation}-{self.chunk_overlap}"
+            else:
+                key += "|truncate"
+        return key
+
+    def _cache_namespace(self, kind):
+        # Single and batch results are shaped differently, so they get separate keys.
+        return f"{kind}|{self.model_key()}"
+
+    def _model_revision(self):
+        if self.model_type == "vader":
+            try:
+                from importlib.metadata import version
+                return f"vaderSentiment-{version('vaderSentiment')}"
+            except Exception:
+                return "vaderSentiment"
+        return self.analyzer.revision
+
+    @metrics.timed("analyzer.inference")
+    def _analyze_batch_uncached(self, texts, batch_size=None):
+        if not texts:
+            return self._empty_results()
+        if self.model_type in BERT_MODEL_TYPES:
+            try:
+                return self._analyze_bert_batch(texts, batch_size or self.batch_size)
+            except Exception as e:
+                # Only this batch falls back; the analyzer stays on BERT.
+                logging.error(f"BERT batch analysis failed: {e}. Scoring this batch with VADER.")
+                metrics.count("analyzer.bert_fallbacks")
+                df = self._vader_as_bert(self._analyze_vader_batch(texts))
+                df.attrs['fallback'] = True
+                return df
+        return self._analyze_vader_batch(texts)
+
+    @staticmethod
+    def _vader_as_bert(df):
+        """VADER results in BERT's columns, so a fallback batch has the usual schema"""
         return pd.DataFrame({
-            'sentiment': sentiments,
-            'scores': scores
+            'sentiment': df['sentiment'],
+            'label': pd.Categorical(df['sentiment'].astype(str)),
+            'score': df['compound'].abs().astype(np.float32),
+            'chunks': np.ones(len(df), dtype=np.int32)
         })
+
+    def _empty_results(self):
+        """Zero-row results with this model's columns and types"""
+        if self.model_type in BERT_MODEL_TYPES:
+            columns = ['sentiment', 'label', 'score', 'chunks']
+        else:
+            columns = ['sentiment', 'compound', 'pos', 'neg', 'neu']
+        return typed_results(pd.DataFrame(columns=columns))
+
+    def _analyze_vader_batch(self, texts):
+        if self._fast_vader is None:
+            self._fast_vader = FastVaderScorer(self.analyzer if self.model_type == "vader" else None)
+        columns = self._fast_vader.score_series(texts)
+        compound = columns['compound']
+        codes = np.where(compound >= 0.05, 2, np.where(compound <= -0.05, 0, 1))
+        return pd.DataFrame({
+            'sentiment': pd.Categorical.from_codes(codes, dtype=SENTIMENT_DTYPE),
+            'compound': compound.astype(np.float32),
+            'pos': columns['pos'].astype(np.float32),
+            'neg': columns['neg'].astype(np.float32),
+            'neu': columns['neu'].astype(np.float32)
+        })
+
+    def _analyze_bert_batch(self, texts, batch_size):
+        """Run the transformer backend over length-sorted micro-batches.
+
+        In 'chunk' mode reviews longer than the model's limit are split into
+        overlapping token windows. Windows of all reviews share the same
+        micro-batches and are combined per review with `self.aggregation`.
+        """
+        classifier = self.analyzer
+        tokenizer = classifier.tokenizer
+        id2label = classifier.config.id2label
+        max_length = self._bert_max_length()
+
+        # Overflowing windows need a fast (Rust) tokenizer; slow ones truncate.
+        if self.long_text == "chunk" and getattr(tokenizer, 'is_fast', False):
+            encoded = tokenizer(
+                texts, truncation=True, max_length=max_length,
+                stride=self.chunk_overlap, return_overflowing_tokens=True
+            )
+            windows = encoded['input_ids']
+            owners = np.asarray(encoded['overflow_to_sample_mapping'])
+        else:
+            windows = tokenizer(texts, truncation=True, max_length=max_length)['input_ids']
+            owners = np.arange(len(texts))
+
+        probabilities = np.zeros((len(windows), len(id2label)))
+        # Sorting by token length keeps similarly sized windows together so
+        # each micro-batch pads to a length close to its actual contents.
+        order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+
+        for batch in self._length_buckets(order, windows, batch_size):
+            inputs = tokenizer.pad(
+                {'input_ids': [windows[i] for i in batch]},
+                return_tensors='np'
+            )
+            probabilities[batch] = softmax(classifier.logits(dict(inputs)))
+
+        lengths = np.array([len(window) for window in windows], dtype=float)
+        combined = self._aggregate_chunks(probabilities, owners, lengths, len(texts))
+        labels = [id2label[int(label_id)].lower() for label_id in combined.argmax(axis=-1)]
+
+        sentiments = ['positive' if label == 'positive' else 'negative' for label in labels]
+        return pd.DataFrame({
+            'sentiment': pd.Categorical(sentiments, dtype=SENTIMENT_DTYPE),
+            'label': pd.Categorical(labels),
+            'score': combined.max(axis=-1).astype(np.float32),
+            'chunks': np.bincount(owners, minlength=len(texts)).astype(np.int32)
+        })
+
+    def _aggregate_chunks(self, probabilities, owners, lengths, n_texts):
+        """Combine per-window class probabilities into one row per text"""
+        if self.aggregation == "max-magnitude":
+            # Keep each text's most confident window
+            order = np.lexsort((probabilities.max(axis=-1), owners))
+            last_of_owner = np.r_[np.flatnonzero(np.diff(owners[order])), len(order) - 1]
+            return probabilities[order[last_of_owner]]
+
+        weights = lengths if self.aggregation == "length-weighted" else np.ones(len(owners))
+        totals = np.zeros((n_texts, probabilities.shape[1]))
+        np.add.at(totals, owners, probabilities * weights[:, None])
+        return totals / np.bincount(owners, weights=weights, minlength=n_texts)[:, None]
+
+    def _bert_max_length(self):
+        if self.max_length:
+            return self.max_length
+        max_length = self.analyzer.tokenizer.model_max_length
+        max_positions = getattr(self.analyzer.config, 'max_position_embeddings', None)
+        if max_positions:
+            max_length = min(max_length, max_positions)
+        return max_length
+
+    def _length_buckets(self, order, encoded, batch_size):
+        """Yield micro-batches capped by both item count and padded token count"""
+        batch = []
+        for i in order:
+            # `order` is sorted ascending, so the newest item is the longest
+            # and determines the padded width of the whole batch.
+            padded_tokens = (len(batch) + 1) * len(encoded[i])
+            if batch and (len(batch) >= batch_size or padded_tokens > self.max_batch_tokens):
+                yield batch
+                batch = []
+            batch.append(i)
+        if batch:
+            yield batch
+
+
+class FastVaderScorer:
+    """Bulk VADER scorer producing exactly the same numbers as polarity_scores.
+
+    The lexicon, booster, negation and emoji tables are compiled once and
+    each distinct text is scored a single time, with the per-word rules
+    working off one lowercased token list instead of re-lowering the whole
+    sentence for every lexicon hit.
+    """
+
+    _NEGATE = frozenset(NEGATE)
+    _MULTIWORD_BOOSTERS = frozenset(key for key in BOOSTER_DICT if ' ' in key)
+    _MAX_TOKEN_CACHE = 500000
+
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer or registry.get('vader')
+        self.lexicon = self.analyzer.lexicon
+        # polarity_scores walks the text one character at a time, so only
+        # single-character emoji keys can ever be substituted.
+        self.emojis = {key: value for key, value in self.analyzer.emojis.items() if len(key) == 1}
+        self._emoji_chars = frozenset(self.emojis)
+        self._tokens = {}
+
+    def score_series(self, texts):
+        """Score an iterable of texts, returning NumPy arrays keyed like polarity_scores"""
+        texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+        codes, uniques = pd.factorize(texts)
+        scores = np.array(
+            [self.score_text(text) for text in uniques],
+            dtype=np.float64
+        ).reshape(-1, 4)[codes]
+        return {
+            'neg': scores[:, 0],
+            'neu': scores[:, 1],
+            'pos': scores[:, 2],
+            'compound': scores[:, 3]
+        }
+
+    def score_text(self, text):
+        """Return (neg, neu, pos, compound) for a single text"""
+        if not text.isascii() and not self._emoji_chars.isdisjoint(text):
+            text = self._replace_emojis(text)
+        text = text.strip()
+
+        words, lowered, uppers = self._tokenize(text)
+        count = len(words)
+        allcaps = sum(uppers)
+        is_cap_diff = 0 < count - allcaps < count
+
+        lexicon = self.lexicon
+        sentiments = [0] * count
+        for i, item_lower in enumerate(lowered):
+            # Boosters, "kind of" and non-lexicon words all score zero.
+            if item_lower not in lexicon or item_lower in BOOSTER_DICT:
+                continue
+            if item_lower == "kind" and i < count - 1 and lowered[i + 1] == "of":
+                continue
+            sentiments[i] = self._valence(lowered, uppers, i, is_cap_diff)
+
+        if 'but' in lowered:
+            sentiments = SentimentIntensityAnalyzer._but_check(lowered, sentiments)
+
+        scores = self.analyzer.score_valence(sentiments, text)
+        return scores['neg'], scores['neu'], scores['pos'], scores['compound']
+
+    def _replace_emojis(self, text):
+        text_no_emoji = ""
+        prev_space = True
+        for char in text:
+            if char in self.emojis:
+                if not prev_space:
+                    text_no_emoji += ' '
+                text_no_emoji += self.emojis[char]
+                prev_space = False
+            else:
+                text_no_emoji += char
+                prev_space = char == ' '
+        return text_no_emoji
+
+    def _tokenize(self, text):
+        words = []
+        lowered = []
+        uppers = []
+        tokens = self._tokens
+        if len(tokens) > self._MAX_TOKEN_CACHE:
+            tokens.clear()
+        for token in text.split():
+            entry = tokens.get(token)
+            if entry is None:
+                word = SentiText._strip_punc_if_word(token)
+                entry = tokens[token] = (word, word.lower(), word.isupper())
+            words.append(entry[0])
+            lowered.append(entry[1])
+            uppers.append(entry[2])
+        return words, lowered, uppers
+
+    def _negated(self, word):
+        return word in self._NEGATE or "n't" in word
+
+    def _valence(self, lowered, uppers, i, is_cap_diff):
+        lexicon = self.lexicon
+        item_lower = lowered[i]
+        valence = lexicon[item_lower]
+
+        if item_lower == "no" and i != len(lowered) - 1 and lowered[i + 1] in lexicon:
+            valence = 0.0
+        if (i > 0 and lowered[i - 1] == "no") \
+           or (i > 1 and lowered[i - 2] == "no") \
+           or (i > 2 and lowered[i - 3] == "no" and lowered[i - 1] in ("or", "nor")):
+            valence = lexicon[item_lower] * N_SCALAR
+
+        if uppers[i] and is_cap_diff:
+            if valence > 0:
+                valence += C_INCR
+            else:
+                valence -= C_INCR
+
+        for start_i in range(0, 3):
+            j = i - (start_i + 1)
+            if i > start_i and lowered[j] not in lexicon:
+                s = self._scalar_inc_dec(lowered[j], uppers[j], valence, is_cap_diff)
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                valence = self._negation_check(valence, lowered, start_i, i)
+                if start_i == 2:
+                    valence = self._special_idioms_check(valence, lowered, i)
+
+        return self.analyzer._least_check(valence, lowered, i)
+
+    @staticmethod
+    def _scalar_inc_dec(word_lower, is_upper, valence, is_cap_diff):
+        scalar = 0.0
+        if word_lower in BOOSTER_DICT:
+            scalar = BOOSTER_DICT[word_lower]
+            if valence < 0:
+                scalar *= -1
+            if is_upper and is_cap_diff:
+                if valence > 0:
+                    scalar += C_INCR
+                else:
+                    scalar -= C_INCR
+        return scalar
+
+    def _negation_check(self, valence, lowered, start_i, i):
+        if start_i == 0:
+            if self._negated(lowered[i - 1]):
+                valence = valence * N_SCALAR
+        if start_i == 1:
+            if lowered[i - 2] == "never" and lowered[i - 1] in ("so", "this"):
+                valence = valence * 1.25
+            elif lowered[i - 2] == "without" and lowered[i - 1] == "doubt":
+                pass
+            elif self._negated(lowered[i - 2]):
+                valence = valence * N_SCALAR
+        if start_i == 2:
+            if lowered[i - 3] == "never" and lowered[i - 2] in ("so", "this") \
+                    or lowered[i - 1] in ("so", "this"):
+                valence = valence * 1.25
+            elif lowered[i - 3] == "without" and "doubt" in (lowered[i - 2], lowered[i - 1]):
+                pass
+            elif self._negated(lowered[i - 3]):
+                valence = valence * N_SCALAR
+        return valence
+
+    def _special_idioms_check(self, valence, lowered, i):
+        onezero = f"{lowered[i - 1]} {lowered[i]}"
+        twoonezero = f"{lowered[i - 2]} {lowered[i - 1]} {lowered[i]}"
+        twoone = f"{lowered[i - 2]} {lowered[i - 1]}"
+        threetwoone = f"{lowered[i - 3]} {lowered[i - 2]} {lowered[i - 1]}"
+        threetwo = f"{lowered[i - 3]} {lowered[i - 2]}"
+
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASES:
+                valence = SPECIAL_CASES[seq]
+                break
+        if len(lowered) - 1 > i:
+            zeroone = f"{lowered[i]} {lowered[i + 1]}"
+            if zeroone in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroone]
+        if len(lowered) - 1 > i + 1:
+            zeroonetwo = f"{lowered[i]} {lowered[i + 1]} {lowered[i + 2]}"
+            if zeroonetwo in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroonetwo]
+
+        # Single-word boosters never match these n-grams, only phrases like "kind of".
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in self._MULTIWORD_BOOSTERS:
+                valence = valence + BOOSTER_DICT[n_gram]
+        return valence
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class SentimentCache:
+    """Two-tier cache for sentiment results: an in-memory LRU in front of SQLite.
+
+    Entries are content-addressed by (model type, model revision,
+    preprocessing config, text), so changing any of them simply misses.
+    Both tiers hold values as JSON, so every lookup returns a fresh copy
+    that callers are free to modify.
+    """
+
+    DEFAULT_PATH = os.path.join(
+        os.path.expanduser("~"), ".cache", "sentiment_analysis", "sentiment_cache.sqlite"
+    )
+
+    def __init__(self, path=DEFAULT_PATH, memory_size=50000, max_disk_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._conn = None
+        self._disk_size = 0
+        if path:
+            try:
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)"
+                )
+                self._conn.commit()
+                self._disk_size = self._disk_bytes()
+            except sqlite3.Error as e:
+                logging.warning(f"Sentiment cache disk tier disabled: {e}")
+                self._conn = None
+
+    @staticmethod
+    def make_key(namespace, text):
+        """Hash a cache namespace and a text into a fixed-size key"""
+        digest = hashlib.sha256(namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get_many(self, keys):
+        """Return a dict of the cached values found for `keys`"""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = json.loads(self._memory[key])
+                else:
+                    missing.append(key)
+            self.hits += len(found)
+
+            from_disk = {}
+            if missing and self._conn is not None:
+                from_disk = self._read_disk(missing)
+                self.disk_hits += len(from_disk)
+                for key, payload in from_disk.items():
+                    found[key] = json.loads(payload)
+                    self._remember(key, payload)
+
+            self.misses += len(missing) - len(from_disk)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items):
+        """Store a dict of key -> JSON-serializable value in both tiers"""
+        if not items:
+            return
+        payloads = {key: json.dumps(value, default=float) for key, value in items.items()}
+        with self._lock:
+            for key, payload in payloads.items():
+                self._remember(key, payload)
+            if self._conn is not None:
+                self._write_disk(payloads)
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_size
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+                self._disk_size = 0
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys):
+        found = {}
+        try:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE results SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Sentiment cache read failed: {e}")
+        return found
+
+    def _write_disk(self, payloads):
+        now = time.time()
+        rows = [(key, payload, len(payload), now) for key, payload in payloads.items()]
+        try:
+            replaced = self._stored_sizes([row[0] for row in rows])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._disk_size += sum(row[2] for row in rows) - replaced
+            self._evict()
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Sentiment cache write failed: {e}")
+            self._conn.rollback()
+            self._disk_size = self._disk_bytes()
+
+    def _stored_sizes(self, keys):
+        """Total size of the rows already stored under `keys` (primary key lookups)"""
+        total = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM results WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchone()[0]
+        return total
+
+    def _disk_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used rows until the disk tier fits its budget.
+
+        The budget is checked against a running total kept by _write_disk, so
+        a write doesn't scan the table; the total is recounted after evicting,
+        which also picks up rows written by other processes.
+        """
+        overflow = self._disk_size - self.max_disk_bytes
+        if overflow <= 0:
+            return
+        # Free a little extra so we don't evict on every subsequent write.
+        target = overflow + self.max_disk_bytes // 10
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM results WHERE key = ?", victims)
+        self._disk_size = self._disk_bytes()
@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# The modules under test live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def review_html(text, day):
+    return (
+        '<div data-hook="review">'
+        f'<span data-hook="review-body">{text}</span>'
+        f'<span data-hook="review-date">Reviewed in the United States on January {day}, 2024</span>'
+        '</div>'
+    )
+
+
+class StubAmazon:
+    """Local review pages: `pages` maps page number to reviews, later pages are empty.
+
+    A review is its text (dated by its page number) or a (text, day) pair.
+    """
+
+    def __init__(self, pages, failures=None, delays=None):
+        self.pages = pages
+        self.failures = dict(failures or {})
+        self.delays = delays or {}
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                page = int(parse_qs(urlparse(self.path).query)['pageNumber'][0])
+                with stub.lock:
+                    stub.requests.append(page)
+                    failing = stub.failures.get(page, 0)
+                    if failing:
+                        stub.failures[page] = failing - 1
+                time.sleep(stub.delays.get(page, 0))
+                if failing:
+                    self.send_error(503)
+                    return
+                body = "".join(
+                    review_html(*review) if isinstance(review, tuple) else review_html(review, page)
+                    for review in stub.pages.get(page, [])
+                )
+                body = f"<html><body>{body}</body></html>".encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/product-reviews/{{product_id}}?pageNumber={{page}}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(pages, **kwargs):
+        server = StubAmazon(pages, **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
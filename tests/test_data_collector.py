@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip("bs4")
+
+from data_collector import ReviewCollector
+
+
+def make_collector(server, monkeypatch=None, **kwargs):
+    collector = ReviewCollector(
+        base_url=server.url, requests_per_second=1000, burst=100, parser='html.parser', **kwargs
+    )
+    if monkeypatch is not None:
+        monkeypatch.setattr(collector, "_backoff_delay", lambda attempt: 0)
+    return collector
+
+
+def texts(pages):
+    return [[review['review_text'] for review in page] for page in pages]
+
+
+PAGES = {page: [f"page {page} review {i}" for i in range(3)] for page in range(1, 5)}
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_pages_arrive_in_order(serve, concurrent):
+    # Early pages answer slowest, so concurrent fetches complete out of order
+    server = serve(PAGES, delays={1: 0.2, 2: 0.1})
+    collector = make_collector(server, max_workers=4)
+    pages = list(collector.iter_amazon_reviews("B0TEST", max_pages=10, concurrent=concurrent))
+    assert texts(pages) == [PAGES[page] for page in range(1, 5)]
+    assert pages[0][0]['date'].day == 1
+
+
+def test_sequential_stops_at_first_empty_page(serve):
+    server = serve(PAGES)
+    collector = make_collector(server)
+    df = collector.get_amazon_reviews("B0TEST", max_pages=10)
+    assert len(df) == 12
+    assert server.requests == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_retries_after_503(serve, monkeypatch, concurrent):
+    server = serve(PAGES, failures={2: 1})
+    collector = make_collector(server, monkeypatch)
+    pages = list(collector.iter_amazon_reviews("B0TEST", max_pages=4, concurrent=concurrent))
+    assert texts(pages) == [PAGES[page] for page in range(1, 5)]
+    assert server.requests.count(2) == 2
+
+
+def test_failed_page_yields_empty_list(serve, monkeypatch):
+    server = serve(PAGES, failures={2: 3})
+    collector = make_collector(server, monkeypatch)
+    completed = []
+    pages = list(collector.iter_amazon_reviews(
+        "B0TEST", max_pages=4, max_retries=3, on_complete=lambda *args: completed.append(args)
+    ))
+    assert texts(pages) == [PAGES[1], [], PAGES[3], PAGES[4]]
+    assert server.requests.count(2) == 3
+    # Only the pages before the failure count as covered
+    assert completed == [(1, False)]
+
+
+def test_stop_at_known_review(serve):
+    server = serve(PAGES)
+    collector = make_collector(server)
+    known = {PAGES[2][1]}
+    completed = []
+    pages = list(collector.iter_amazon_reviews(
+        "B0TEST", max_pages=10,
+        is_known=lambda review: review['review_text'] in known,
+        on_complete=lambda *args: completed.append(args)
+    ))
+    assert texts(pages) == [PAGES[1], [PAGES[2][0], PAGES[2][2]]]
+    assert server.requests == [1, 2]
+    assert completed == []
+
+
+def test_known_reviews_skipped_without_stopping(serve):
+    server = serve(PAGES)
+    collector = make_collector(server)
+    known = {PAGES[2][1]}
+    completed = []
+    pages = list(collector.iter_amazon_reviews(
+        "B0TEST", max_pages=10,
+        is_known=lambda review: review['review_text'] in known,
+        stop_at_known=False,
+        on_complete=lambda *args: completed.append(args)
+    ))
+    assert texts(pages) == [PAGES[1], [PAGES[2][0], PAGES[2][2]], PAGES[3], PAGES[4]]
+    assert completed == [(4, True)]
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from dedup import ReviewDeduplicator
+from review_store import ReviewStore
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.scored = []
+
+    def analyze_batch(self, texts):
+        texts = list(texts)
+        self.scored.extend(texts)
+        return pd.DataFrame({'sentiment': ['positive'] * len(texts)})
+
+
+def test_short_reviews_are_not_merged_on_tokens():
+    dedup = ReviewDeduplicator()
+    clusters, new = dedup.assign(["great product", "great product"])
+    assert clusters[0] != clusters[1]
+    assert new.all()
+
+
+def test_exact_repeats_merge_at_any_length():
+    dedup = ReviewDeduplicator()
+    analyzer = FakeAnalyzer()
+    first = dedup.score(["great product", "great product"], analyzer, identities=["a", "b"])
+    second = dedup.score(["great product", "ok"], analyzer, identities=["a", None])
+    assert first['cluster'][0] != first['cluster'][1]
+    assert second['cluster'][0] == first['cluster'][0]
+    assert list(second['is_duplicate']) == [True, False]
+    assert second['duplicate_count'][0] == 2
+    assert analyzer.scored == ["great product", "great product", "ok"]
+
+
+def test_identities_and_tokens_share_clusters():
+    dedup = ReviewDeduplicator()
+    long_text = "this blender is loud but it crushes ice really well"
+    clusters, new = dedup.assign([long_text, long_text, long_text], identities=["x", "y", "x"])
+    assert clusters[0] == clusters[1] == clusters[2]
+    assert list(new) == [True, False, False]
+
+
+def test_same_day_identical_reviews_share_a_store_identity():
+    # Two customers, same short text, same day: the store identity can't tell
+    # them apart, so they are merged (a documented limitation).
+    first = {'review_text': "Great product!", 'date': pd.Timestamp("2024-03-01")}
+    second = {'review_text': "Great product!", 'date': pd.Timestamp("2024-03-01 18:00")}
+    identities = [ReviewStore.review_hash(first), ReviewStore.review_hash(second)]
+    assert identities[0] == identities[1]
+
+    clusters, new = ReviewDeduplicator().assign(["great product", "great product"], identities)
+    assert clusters[0] == clusters[1]
+    assert list(new) == [True, False]
+
+    # Without identities they stay apart
+    clusters, _ = ReviewDeduplicator().assign(["great product", "great product"])
+    assert clusters[0] != clusters[1]
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+from vaderSentiment.vaderSentiment import BOOSTER_DICT, NEGATE, SPECIAL_CASES, SentimentIntensityAnalyzer
+
+from sentiment_analyzer import FastVaderScorer
+
+EXTRAS = (
+    list(BOOSTER_DICT) + list(NEGATE) + [word for idiom in SPECIAL_CASES for word in idiom.split()]
+    + ['but', 'BUT', 'kind', 'of', 'no', 'never', 'so', 'this', 'without', 'doubt', 'least', 'at',
+       'very', 'GREAT', 'Good!', 'bad.', '!!!', '?', ':)', ':-(', "isn't", "don't", 'NOT', 'LOL',
+       'the', 'a', 'product', 'sort of', 'kinda', '😀', '😡', '🙂', 'good😀', '👍']
+)
+
+@pytest.fixture(scope="module")
+def vader():
+    return SentimentIntensityAnalyzer()
+
+def random_texts(vader, count, seed):
+    rng = random.Random(seed)
+    words = list(vader.lexicon)[:3000] + EXTRAS * 3
+    idioms = list(SPECIAL_CASES)
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(words) for _ in range(rng.randint(0, 25))]
+        tokens = [token.upper() if rng.random() < 0.1 else token for token in tokens]
+        if tokens and rng.random() < 0.2:
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(idioms))
+        text = ' '.join(tokens)
+        if rng.random() < 0.3:
+            text += rng.choice(['!', '!!', '?', '??!', '...'])
+        if rng.random() < 0.1:
+            text = text.replace(' ', '  ', 1)
+        texts.append(text)
+    return texts
+
+@pytest.mark.parametrize("seed", range(4))
+def test_score_text_matches_polarity_scores(vader, seed):
+    scorer = FastVaderScorer(vader)
+    mismatches = []
+    for text in random_texts(vader, 5000, seed):
+        expected = vader.polarity_scores(text)
+        expected = (expected['neg'], expected['neu'], expected['pos'], expected['compound'])
+        if scorer.score_text(text) != expected:
+            mismatches.append((text, expected, scorer.score_text(text)))
+    assert mismatches == []
+
+def test_score_series_matches_polarity_scores(vader):
+    texts = random_texts(vader, 2000, seed=99) + ['', 'Great product!', 'Great product!']
+    scores = FastVaderScorer(vader).score_series(texts)
+    for i, text in enumerate(texts):
+        expected = vader.polarity_scores(text)
+        assert {key: scores[key][i] for key in expected} == expected, text
@@ -0,0 +1,60 @@
+import random
+
+import nltk
+import pytest
+from nltk.tokenize import NLTKWordTokenizer
+
+import preprocessor
+from preprocessor import NON_ALPHA_PATTERN, TREEBANK_SPLITS, TextPreprocessor
+from resources import ResourceRegistry
+
+WORDS = [
+    'great', 'product', 'not', 'the', 'a', 'me', 'can', 'na', 'ta', 'reviews', 'batteries', 'is', 'was',
+    'cannot', 'Cannot', 'CANNOT', 'gimme', 'gonna', 'gotta', 'lemme', 'wanna', 'WANNA', 'dye', 'moren',
+    'tis', 'twas', "can't", "won't", "d'ye", "'tis", "more'n", 'gonna!', 'wanna.', '42', 'x-ray', 'e-mail',
+    '"quoted"', '(aside)', 'cannotbe', 'gonnabe', 'hello...', 'U.S.A.', '#1', ':)',
+]
+SEPARATORS = [' ', ' ', ' ', '  ', '\t', '\n', ' \n ']
+
+def random_texts(count, seed):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(0, 12))]
+        text = ''.join(word + rng.choice(SEPARATORS) for word in words)
+        texts.append(rng.choice(['', ' ', '\t']) + text)
+    return texts
+
+class StubLemmatizer:
+    def lemmatize(self, token):
+        return token[:-1] if token.endswith('s') and len(token) > 3 else token
+
+@pytest.fixture
+def stub_preprocessor(monkeypatch):
+    """A TextPreprocessor using stub stopwords and lemmatizer instead of NLTK data"""
+    registry = ResourceRegistry()
+    registry.register('stopwords', lambda: frozenset({'the', 'a', 'is', 'was', 'me', 'not'}))
+    registry.register('lemmatizer', StubLemmatizer)
+    registry.register('punkt', lambda: True)
+    monkeypatch.setattr(preprocessor, 'registry', registry)
+    try:
+        nltk.word_tokenize('punkt check')
+    except LookupError:
+        # Without punkt data, tokenize as one sentence: stripped text has
+        # no sentence punctuation for punkt to split on anyway.
+        monkeypatch.setattr(nltk.tokenize, 'word_tokenize', NLTKWordTokenizer().tokenize)
+    return TextPreprocessor()
+
+@pytest.mark.parametrize("seed", range(3))
+def test_treebank_splits_match_word_tokenizer(seed):
+    tokenizer = NLTKWordTokenizer()
+    for text in random_texts(3000, seed):
+        stripped = NON_ALPHA_PATTERN.sub('', text.lower())
+        expected = tokenizer.tokenize(stripped)
+        split = [part for token in stripped.split() for part in TREEBANK_SPLITS.get(token, (token,))]
+        assert split == expected, repr(stripped)
+
+def test_preprocess_batch_matches_preprocess(stub_preprocessor):
+    texts = random_texts(3000, seed=7) + ['Great product!', 'Great product!', '', 'Batteries died.']
+    expected = [stub_preprocessor.preprocess(text) for text in texts]
+    assert stub_preprocessor.preprocess_batch(texts) == expected
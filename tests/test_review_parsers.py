@@ -0,0 +1,92 @@
+import os
+import warnings
+
+import pytest
+
+from review_parsers import PARSER_BACKENDS, SoupReviewParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "fixtures")
+
+EDGE_PAGES = {
+    "blank": b"",
+    "whitespace": b"  \n\t",
+    "comment only": b"<!-- only a comment -->",
+    "xml declaration only": b"<?xml version='1.0'?>",
+    "no reviews": b"<html><body><p>No reviews yet</p></body></html>",
+    "binary": b"\x00\x01\x02\xff",
+    "latin-1": "<html><body>caf\xe9</body></html>".encode("latin-1"),
+    "review without date": (
+        b'<div data-hook="review"><span data-hook="review-body">Fine</span></div>'
+    ),
+    "unparseable date": (
+        b'<div data-hook="review"><span data-hook="review-body">Fine</span>'
+        b'<span data-hook="review-date">Reviewed on someday</span></div>'
+    ),
+}
+
+
+def fixture_pages():
+    names = sorted(name for name in os.listdir(FIXTURES_DIR) if name.endswith(".html"))
+    pages = {}
+    for name in names:
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            pages[name] = f.read()
+    return pages
+
+
+def available_backends():
+    backends = []
+    for name, factory in PARSER_BACKENDS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        backends.append(name)
+    return backends
+
+
+PAGES = {**fixture_pages(), **EDGE_PAGES}
+
+
+@pytest.fixture(scope="module")
+def reference():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return {name: SoupReviewParser().parse(content) for name, content in PAGES.items()}
+
+
+def test_fixtures_have_reviews(reference):
+    for name in fixture_pages():
+        assert reference[name], name
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("page", list(PAGES))
+def test_backend_matches_soup(backend, page, reference):
+    parser = PARSER_BACKENDS[backend]()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        reviews = parser.parse(PAGES[page])
+    assert len(reviews) == len(reference[page])
+    for got, expected in zip(reviews, reference[page]):
+        assert got['review_text'] == expected['review_text']
+        assert got['category'] == expected['category']
+        assert got['date'] is expected['date'] or got['date'] == expected['date']
+
+
+def test_parser_error_counts_as_failed_page(monkeypatch):
+    from data_collector import ReviewCollector
+
+    class BrokenParser:
+        name = "broken"
+
+        def parse(self, content):
+            raise ValueError("unexpected markup")
+
+    collector = ReviewCollector(parser='html.parser')
+    collector.parser = BrokenParser()
+    monkeypatch.setattr(collector, "_fetch_page", lambda product_id, page, max_retries: b"<html></html>")
+    assert collector._fetch_and_parse("B0TEST", 1, 1) is None
+    # A failed page is yielded as an empty one, and paging continues past it
+    monkeypatch.setattr(collector, "_fetch_and_parse", lambda product_id, page, max_retries: None)
+    assert list(collector.iter_amazon_reviews("B0TEST", max_pages=3)) == [[], [], []]
@@ -0,0 +1,125 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("streamlit")
+
+from app import fetch_new_reviews
+from data_collector import ReviewCollector
+from review_store import ReviewStore
+
+PRODUCT = "B0TEST0001"
+PAGE_SIZE = 3
+
+
+def paginate(reviews):
+    """Newest-first (text, day) reviews split into pages of PAGE_SIZE"""
+    return {
+        start // PAGE_SIZE + 1: reviews[start:start + PAGE_SIZE]
+        for start in range(0, len(reviews), PAGE_SIZE)
+    }
+
+
+def reviews(first, last):
+    return [(f"review number {i}", i) for i in range(last, first - 1, -1)]
+
+
+@pytest.fixture
+def store():
+    return ReviewStore(":memory:")
+
+
+@pytest.fixture
+def crawl(serve, store, monkeypatch):
+    """Run the app's delta fetch against stub pages; returns (new review texts, pages requested)"""
+
+    def run(pages, max_pages, **stub_kwargs):
+        server = serve(pages, **stub_kwargs)
+        collector = ReviewCollector(
+            base_url=server.url, requests_per_second=1000, burst=100, parser='html.parser'
+        )
+        monkeypatch.setattr(collector, "_backoff_delay", lambda attempt: 0)
+        texts = []
+        for page_reviews in fetch_new_reviews(collector, store, PRODUCT, max_pages):
+            if page_reviews:
+                store.save_reviews(PRODUCT, pd.DataFrame(page_reviews))
+                texts.extend(review['review_text'] for review in page_reviews)
+        return texts, sorted(server.requests)
+
+    return run
+
+
+def texts(first, last):
+    return [text for text, _ in reviews(first, last)]
+
+
+def test_first_crawl_records_its_depth(crawl, store):
+    new, requested = crawl(paginate(reviews(1, 10)), max_pages=2)
+    assert new == texts(5, 10)
+    assert requested == [1, 2]
+    assert store.covers_pages(PRODUCT, 2)
+    assert not store.covers_pages(PRODUCT, 3)
+
+
+def test_covered_store_stops_at_first_known_review(crawl, store):
+    crawl(paginate(reviews(1, 10)), max_pages=2)
+    new, requested = crawl(paginate(reviews(1, 12)), max_pages=2)
+    assert new == texts(11, 12)
+    assert requested == [1]
+    assert store.covers_pages(PRODUCT, 2)
+
+
+def test_shallow_store_pages_through_known_reviews(crawl, store):
+    crawl(paginate(reviews(1, 10)), max_pages=1)
+    new, requested = crawl(paginate(reviews(1, 11)), max_pages=3)
+    # Page 1 holds review 11 and two known ones; older pages are filled in
+    assert new == [text for text in texts(3, 11) if text not in texts(8, 10)]
+    assert requested == [1, 2, 3]
+    assert store.covers_pages(PRODUCT, 3)
+    assert not store.covers_pages(PRODUCT, 4)
+
+
+def test_exhausted_product_is_covered_at_any_depth(crawl, store):
+    new, _ = crawl(paginate(reviews(1, 10)), max_pages=10)
+    assert new == texts(1, 10)
+    assert store.covers_pages(PRODUCT, 50)
+
+    new, requested = crawl(paginate(reviews(1, 10)), max_pages=50)
+    assert new == []
+    assert requested == [1]
+
+
+def test_failed_page_limits_coverage(crawl, store):
+    new, _ = crawl(paginate(reviews(1, 12)), max_pages=4, failures={2: 3})
+    assert new == [text for text in texts(1, 12) if text not in texts(7, 9)]
+    assert store.covers_pages(PRODUCT, 1)
+    assert not store.covers_pages(PRODUCT, 2)
+
+    # The next run pages through again and picks up the missed page
+    new, requested = crawl(paginate(reviews(1, 12)), max_pages=4)
+    assert new == texts(7, 9)
+    assert requested == [1, 2, 3, 4]
+    assert store.covers_pages(PRODUCT, 4)
+
+
+def test_rescrape_is_idempotent(crawl, store):
+    crawl(paginate(reviews(1, 10)), max_pages=10)
+    before = store.load_reviews(PRODUCT)
+    hashes = store.known_hashes(PRODUCT)
+
+    new, _ = crawl(paginate(reviews(1, 10)), max_pages=10)
+    assert new == []
+    frame = pd.DataFrame([{'review_text': text, 'date': pd.Timestamp(2024, 1, day)} for text, day in reviews(1, 10)])
+    store.save_reviews(PRODUCT, frame)
+    assert store.known_hashes(PRODUCT) == hashes
+    pd.testing.assert_frame_equal(store.load_reviews(PRODUCT), before)
+
+
+def test_sentiments_are_kept_per_model(store):
+    frame = pd.DataFrame([{'review_text': "fine", 'date': pd.Timestamp(2024, 1, 1), 'processed_text': "fine"}])
+    store.save_reviews(PRODUCT, frame.assign(sentiment="positive"), "vader|x")
+    store.save_reviews(PRODUCT, frame.assign(sentiment="negative"), "bert|x")
+    store.save_reviews(PRODUCT, frame.assign(sentiment="positive"), "vader|x")
+    assert store.load_reviews(PRODUCT, "vader|x")['sentiment'].tolist() == ["positive"]
+    assert store.load_reviews(PRODUCT, "bert|x")['sentiment'].tolist() == ["negative"]
+    assert store.load_reviews(PRODUCT, "other")['sentiment'].isna().all()
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollups import SentimentRollup
+
+GROUPER_FREQS = {'day': 'D', 'week': 'W-SUN', 'month': 'MS'}
+
+
+def make_reviews(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2023-12-20") + pd.to_timedelta(rng.integers(0, 90 * 24 * 60, n), unit="min")
+    dates = pd.Series(dates)
+    # Week and month boundaries: Sunday night, Monday midnight, last/first of a month
+    dates[:6] = pd.to_datetime([
+        "2024-01-07 23:59:59", "2024-01-08 00:00:00", "2024-01-14 00:00:00",
+        "2024-01-31 23:59:59", "2024-02-01 00:00:00", "2023-12-31 12:00:00",
+    ])
+    dates[rng.random(n) < 0.1] = pd.NaT
+    return pd.DataFrame({
+        'date': dates,
+        'category': rng.choice(["Electronics", "Kitchen", None], n),
+        'sentiment': pd.Categorical(rng.choice(["positive", "negative", "neutral"], n)),
+    })
+
+
+def expected_trend(df, granularity):
+    grouped = df.groupby([pd.Grouper(key='date', freq=GROUPER_FREQS[granularity]), 'sentiment'],
+                         observed=True).size()
+    table = grouped.unstack('sentiment', fill_value=0)
+    table = table[table.sum(axis=1) > 0]
+    if granularity == 'week':
+        # Weekly bins are labelled by their last day; the rollup uses the first
+        table.index = table.index - pd.Timedelta(days=6)
+    table.index.name = 'date'
+    table.columns = table.columns.astype(str)
+    return table.sort_index(axis=1)
+
+
+def rollup_of(chunks):
+    rollup = SentimentRollup()
+    for chunk in chunks:
+        rollup.add(chunk, "P1")
+    return rollup
+
+
+def actual_trend(rollup, granularity):
+    table = rollup.trend_table(granularity, "P1")
+    table.columns = table.columns.astype(str)
+    table.columns.name = 'sentiment'
+    return table.sort_index(axis=1)
+
+
+@pytest.mark.parametrize("granularity", list(GROUPER_FREQS))
+@pytest.mark.parametrize("chunk_size", [500, 37, 5])
+def test_trend_matches_pandas_grouper(granularity, chunk_size):
+    df = make_reviews()
+    rollup = rollup_of(df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+    pd.testing.assert_frame_equal(
+        actual_trend(rollup, granularity), expected_trend(df, granularity), check_dtype=False
+    )
+
+
+def test_week_starts_on_monday():
+    df = pd.DataFrame({
+        'date': pd.to_datetime(["2024-01-07 23:59", "2024-01-08 00:00"]),
+        'sentiment': ["positive", "positive"],
+    })
+    table = rollup_of([df]).trend_table('week', "P1")
+    assert list(table.index) == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-08")]
+
+
+def test_totals_include_undated_reviews():
+    df = make_reviews(seed=1)
+    rollup = rollup_of([df.iloc[:200], df.iloc[200:]])
+    expected = df['sentiment'].astype(str).value_counts()
+    assert rollup.sentiment_counts("P1").sort_index().to_dict() == expected.sort_index().to_dict()
+    assert rollup.trend_table('day', "P1").to_numpy().sum() == df['date'].notna().sum()
+
+    categories = df.assign(category=df['category'].fillna('Unknown'))
+    expected = pd.crosstab(categories['category'], categories['sentiment'].astype(str))
+    table = rollup.category_table("P1")
+    table.columns = table.columns.astype(str)
+    assert table.to_dict() == expected.to_dict()
+
+
+def test_products_are_kept_apart():
+    df = make_reviews(seed=2)
+    rollup = SentimentRollup()
+    rollup.add(df.iloc[:100], "P1")
+    rollup.add(df.iloc[100:], "P2")
+    assert rollup.sentiment_counts("P1").sum() == 100
+    assert rollup.sentiment_counts().sum() == len(df)
+    assert SentimentRollup().trend_table().empty
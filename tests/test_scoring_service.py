@@ -0,0 +1,102 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from scoring_service import MAX_BODY_BYTES, ScoringClient, ScoringService
+from sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SentimentAnalyzer("vader")
+
+
+@pytest.fixture
+def service(analyzer):
+    """A ScoringService on an ephemeral localhost port, run on its own event loop thread"""
+    loop = asyncio.new_event_loop()
+    # A long wait so concurrent requests reliably share a batch
+    service = ScoringService(analyzer, max_batch_size=64, max_wait=0.2)
+    port = loop.run_until_complete(service.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    service.url = f"http://127.0.0.1:{port}"
+    service.port = port
+    yield service
+    asyncio.run_coroutine_threadsafe(service.close(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def raw_request(port, data):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(data)
+        response = b""
+        chunk = sock.recv(65536)
+        while chunk:
+            response += chunk
+            chunk = sock.recv(65536)
+    return response.decode("latin-1")
+
+
+def test_single_matches_analyzer(service, analyzer):
+    result = ScoringClient(service.url).score("I love this product!")
+    expected = analyzer.analyze_text("I love this product!")
+    assert result["sentiment"] == expected["sentiment"]
+    assert result["scores"] == expected["scores"]
+
+
+def test_bulk_keeps_order(service):
+    texts = ["Great value", "Terrible, broke in a day", "It is a box"]
+    results = ScoringClient(service.url).score_bulk(texts)
+    assert [result["sentiment"] for result in results] == ["positive", "negative", "neutral"]
+    assert ScoringClient(service.url).score_bulk([]) == []
+
+
+def test_concurrent_requests_are_coalesced(service):
+    texts = [f"review {i} is {'great' if i % 2 else 'awful'}" for i in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda text: ScoringClient(service.url).score(text), texts))
+    assert [result["sentiment"] for result in results] == [
+        "positive" if i % 2 else "negative" for i in range(16)
+    ]
+    batching = ScoringClient(service.url).stats()["batching"]
+    assert batching["batches"] < len(texts)
+    assert batching["mean_batch_size"] > 1
+
+
+def test_stats_reports_endpoints(service):
+    client = ScoringClient(service.url)
+    client.score("fine")
+    client.score_bulk(["fine", "bad"])
+    stats = client.stats()
+    assert stats["model"].startswith("vader|")
+    assert stats["endpoints"]["/score"]["count"] == 1
+    assert stats["endpoints"]["/score/bulk"]["count"] == 1
+    assert stats["endpoints"]["/score"]["p99_ms"] >= 0
+
+
+def test_bad_payloads(service):
+    assert requests.post(service.url + "/score", json={"texts": []}, timeout=5).status_code == 400
+    assert requests.post(service.url + "/score", data=b"{", timeout=5).status_code == 400
+    assert requests.get(service.url + "/score", timeout=5).status_code == 405
+    assert requests.get(service.url + "/nope", timeout=5).status_code == 404
+
+
+@pytest.mark.parametrize("length, status", [
+    ("abc", 400),
+    ("-5", 400),
+    (str(MAX_BODY_BYTES + 1), 413),
+])
+def test_content_length_header(service, length, status):
+    response = raw_request(
+        service.port, f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1")
+    )
+    assert response.startswith(f"HTTP/1.1 {status} ")
+    # The server keeps answering afterwards
+    assert ScoringClient(service.url).score("good")["sentiment"] == "positive"
@@ -0,0 +1,105 @@
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tokenizers")
+pytest.importorskip("transformers")
+
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import PreTrainedTokenizerFast
+
+import resources
+import sentiment_analyzer
+from bert_backends import SequenceClassifier
+from sentiment_analyzer import RESULT_DTYPES, SentimentAnalyzer
+from sentiment_cache import SentimentCache
+
+WORDS = ["good", "bad", "ok", "great", "awful", "meh", "the", "product"]
+
+
+def make_tokenizer(max_length):
+    vocab = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3, **{w: i + 4 for i, w in enumerate(WORDS)}}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, pad_token="[PAD]", unk_token="[UNK]",
+        cls_token="[CLS]", sep_token="[SEP]", model_max_length=max_length
+    )
+
+
+class FakeClassifier(SequenceClassifier):
+    """Counts positive minus negative words; raises while `fail` is set"""
+
+    fail = False
+
+    def logits(self, inputs):
+        if self.fail:
+            raise RuntimeError("inference failed")
+        ids = inputs['input_ids']
+        score = (np.isin(ids, [4, 7]).sum(1) - np.isin(ids, [5, 8]).sum(1)).astype(float)
+        return np.stack([-score, score], 1)
+
+
+@pytest.fixture
+def fake_bert(monkeypatch):
+    config = types.SimpleNamespace(
+        id2label={0: 'NEGATIVE', 1: 'POSITIVE'}, _name_or_path='fake', max_position_embeddings=512
+    )
+    classifier = FakeClassifier(make_tokenizer(16), config, 'fp32')
+    registry = resources.ResourceRegistry()
+    registry.register('bert', lambda: classifier)
+    registry.register('vader', resources._load_vader)
+    monkeypatch.setattr(sentiment_analyzer, "registry", registry)
+    return classifier
+
+
+def test_fallback_batch_keeps_bert_columns(fake_bert):
+    analyzer = SentimentAnalyzer('bert', chunk_overlap=2, cache=SentimentCache(":memory:"))
+    analyzer.analyze_batch(["good", "bad"])
+
+    fake_bert.fail = True
+    results = analyzer.analyze_batch(["good", "ok"])
+    assert list(results.columns) == ['sentiment', 'label', 'score', 'chunks']
+    assert str(results['chunks'].dtype) == RESULT_DTYPES['chunks']
+    assert str(results['score'].dtype) == RESULT_DTYPES['score']
+    # "ok" is positive to VADER but not to the fake model
+    assert results['label'].tolist() == ['positive', 'positive']
+    assert results['chunks'].tolist() == [1, 1]
+
+    # The fallback row was not cached as a BERT result
+    fake_bert.fail = False
+    assert analyzer.analyze_batch(["ok"])['label'].tolist() == ['negative']
+
+
+def test_fallback_batch_without_cache(fake_bert):
+    fake_bert.fail = True
+    results = SentimentAnalyzer('bert', chunk_overlap=2).analyze_batch(["good", "awful"])
+    assert list(results.columns) == ['sentiment', 'label', 'score', 'chunks']
+    assert results['label'].tolist() == ['positive', 'negative']
+    assert results.attrs['fallback']
+
+
+@pytest.mark.parametrize("overlap", [14, 32])
+def test_chunk_overlap_must_fit_in_a_window(fake_bert, overlap):
+    with pytest.raises(ValueError, match="chunk_overlap"):
+        SentimentAnalyzer('bert', chunk_overlap=overlap)
+
+
+def test_largest_valid_chunk_overlap(fake_bert):
+    analyzer = SentimentAnalyzer('bert', chunk_overlap=13)
+    results = analyzer.analyze_batch([" ".join(["good"] * 40)])
+    assert results['chunks'][0] > 1
+    assert not results.attrs.get('fallback')
+
+
+def test_negative_chunk_overlap():
+    with pytest.raises(ValueError, match="chunk_overlap"):
+        SentimentAnalyzer('vader', chunk_overlap=-1)
+
+
+def test_truncate_ignores_chunk_overlap(fake_bert):
+    SentimentAnalyzer('bert', long_text="truncate", chunk_overlap=32)
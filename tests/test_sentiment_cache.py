@@ -0,0 +1,71 @@
+import json
+
+from sentiment_cache import SentimentCache
+
+
+def value(i, size=0):
+    return {'sentiment': 'positive', 'scores': {'compound': i / 100}, 'pad': "x" * size}
+
+
+def test_memory_tier_is_lru():
+    cache = SentimentCache(path=None, memory_size=2)
+    cache.set_many({'a': value(1), 'b': value(2)})
+    assert cache.get('a') == value(1)  # 'a' is now the most recent
+    cache.set('c', value(3))
+    assert cache.get('b') is None
+    assert cache.get('a') == value(1)
+    assert cache.get('c') == value(3)
+    assert cache.stats()['memory_entries'] == 2
+
+
+def test_disk_tier_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SentimentCache(path, memory_size=1).set_many({'a': value(1), 'b': value(2)})
+    reopened = SentimentCache(path)
+    assert reopened.get_many(['a', 'b', 'missing']) == {'a': value(1), 'b': value(2)}
+    stats = reopened.stats()
+    assert (stats['memory_hits'], stats['disk_hits'], stats['misses']) == (0, 2, 1)
+    # Disk hits are promoted to the memory tier
+    reopened.get('a')
+    assert reopened.stats()['memory_hits'] == 1
+
+
+def test_disk_tier_is_trimmed_to_budget(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    row_size = len(json.dumps(value(0, 100)))
+    cache = SentimentCache(path, memory_size=1, max_disk_bytes=20 * row_size)
+    for i in range(50):
+        cache.set(f"k{i}", value(0, 100))
+    disk_bytes = cache.stats()['disk_bytes']
+    assert 0 < disk_bytes <= 20 * row_size
+    assert disk_bytes == cache._disk_bytes()
+
+    # The least recently used rows went first
+    reopened = SentimentCache(path)
+    assert reopened.get('k0') is None
+    assert reopened.get('k49') == value(0, 100)
+
+    cache.clear()
+    assert cache.stats()['disk_bytes'] == 0
+    assert SentimentCache(path).get('k49') is None
+
+
+def test_callers_cannot_modify_cached_values():
+    cache = SentimentCache(path=None)
+    stored = value(1)
+    cache.set('a', stored)
+    stored['scores']['compound'] = 99
+    stored['fallback'] = True
+
+    first = cache.get('a')
+    first['scores']['compound'] = 42
+    first['extra'] = 1
+    assert cache.get('a') == value(1)
+    assert cache.get_many(['a'])['a'] is not cache.get_many(['a'])['a']
+
+
+def test_values_are_json_numbers():
+    import numpy as np
+    cache = SentimentCache(path=None)
+    cache.set('a', {'score': np.float32(0.5)})
+    assert type(cache.get('a')['score']) is float
@@ -0,0 +1,77 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualizer import WordCloudEngine, wordcloud_figure
+
+WORDS = ["battery", "screen", "cheap", "sturdy", "broke", "love", "return", "fast"]
+
+
+def make_batch(seed, n=200):
+    rng = np.random.default_rng(seed)
+    texts = [" ".join(rng.choice(WORDS, rng.integers(0, 8))) for _ in range(n)]
+    texts[0] = None
+    sentiments = pd.Categorical(rng.choice(["positive", "negative", "neutral"], n))
+    return texts, sentiments
+
+
+def fresh_counts(batches, sentiments=None):
+    counts = Counter()
+    for texts, labels in batches:
+        for text, label in zip(texts, labels):
+            if sentiments is None or label in sentiments:
+                counts.update((text or "").split())
+    return counts
+
+
+@pytest.mark.parametrize("sentiments", [None, ["positive"], ["negative", "neutral"], ["missing"]])
+def test_frequencies_match_a_fresh_count(sentiments):
+    engine = WordCloudEngine()
+    batches = [make_batch(seed) for seed in range(3)]
+    for texts, labels in batches:
+        engine.add(texts, labels)
+    assert engine.frequencies(sentiments) == fresh_counts(batches, sentiments)
+
+
+def test_rendered_slices_are_cached_until_add():
+    pytest.importorskip("wordcloud")
+    engine = WordCloudEngine(width=100, height=50)
+    engine.add(*make_batch(0))
+    positive = engine.render(["positive"])
+    assert engine.render(["positive"]) is positive
+    assert engine.render(None) is engine.render(None)
+
+    # New reviews invalidate every cached slice, and the counts include them
+    batch = make_batch(1)
+    engine.add(*batch)
+    assert engine.render(["positive"]) is not positive
+    assert engine.frequencies(["positive"]) == fresh_counts([make_batch(0), batch], ["positive"])
+
+
+def test_render_cache_is_bounded():
+    pytest.importorskip("wordcloud")
+    engine = WordCloudEngine(width=100, height=50, max_images=2)
+    engine.add(*make_batch(0))
+    first = engine.render(["positive"])
+    engine.render(["negative"])
+    engine.render(["neutral"])
+    assert len(engine._images) == 2
+    assert engine.render(["positive"]) is not first
+
+
+def test_empty_slice_renders_nothing():
+    engine = WordCloudEngine()
+    engine.add(["", None], ["positive", "negative"])
+    assert engine.render(["positive"]) is None
+
+
+def test_wordcloud_figure_is_not_tracked_by_pyplot():
+    wordcloud = pytest.importorskip("wordcloud")
+    import matplotlib.pyplot as plt
+    before = plt.get_fignums()
+    cloud = wordcloud.WordCloud(width=100, height=50).generate_from_frequencies({"good": 3, "bad": 1})
+    fig = wordcloud_figure(cloud)
+    assert plt.get_fignums() == before
+    assert len(fig.axes) == 1
@@ -1,66 +1,146 @@
-import matplotlib.pyplot as plt
-# Remove seaborn style
-# plt.style.use('seaborn')  # Remove this line
-from wordcloud import WordCloud
+# matplotlib, wordcloud and plotly are imported where they are used, so
+# importing this module (and starting the app) does not pay for them.
 import pandas as pd
-from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
+from collections import Counter, OrderedDict
+from instrumentation import metrics
+from rollups import SentimentRollup
 
-class SentimentVisualizer:
-    def __init__(self):
-        # Use a built-in matplotlib style instead
-        plt.style.use('default')  # or try 'classic', 'bmh', 'ggplot'
+def wordcloud_figure(wordcloud):
+    """Draw a WordCloud on a standalone figure that is freed once unreferenced"""
+    # Figures created outside pyplot are not tracked by its global figure
+    # manager, so nothing needs closing and no stray figures accumulate.
+    import matplotlib.style
+    from matplotlib.figure import Figure
+    with matplotlib.style.context('default'):
+        fig = Figure(figsize=(10, 5))
+        ax = fig.subplots()
+        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.axis('off')
+    return fig
+
+class WordCloudEngine:
+    """Term counts per sentiment slice, built once per review batch.
+
+    Counts come from the preprocessor's tokens (the `processed_text`
+    column), so switching slices only merges counters and lays out the
+    cloud with `generate_from_frequencies`; rendered figures are cached by
+    slice until new reviews arrive.
+    """
+
+    def __init__(self, width=800, height=400, max_images=8):
+        self.width = width
+        self.height = height
+        self.max_images = max_images
+        self._counts = {}
+        self._images = OrderedDict()
+
+    @metrics.timed("visualizer.wordcloud_count_terms")
+    def add(self, processed_texts, sentiments):
+        """Count tokens of a batch of preprocessed texts into their sentiment slices"""
+        batch = pd.DataFrame({
+            'text': pd.Series(processed_texts).fillna('').astype(str).values,
+            'sentiment': pd.Series(sentiments).values
+        })
+        for sentiment, texts in batch.groupby('sentiment', observed=True)['text']:
+            counts = self._counts.setdefault(sentiment, Counter())
+            for text in texts:
+                counts.update(text.split())
+        self._images.clear()
+
+    def frequencies(self, sentiments=None):
+        """Merged term counts for the given sentiments (all slices when None)"""
+        if sentiments is None:
+            sentiments = self._counts.keys()
+        merged = Counter()
+        for sentiment in sentiments:
+            merged.update(self._counts.get(sentiment, {}))
+        return merged
+
+    @metrics.timed("visualizer.wordcloud_render")
+    def render(self, sentiments=None):
+        """Word cloud figure for a slice, or None when it has no terms"""
+        key = None if sentiments is None else tuple(sorted(sentiments))
+        if key in self._images:
+            self._images.move_to_end(key)
+            metrics.count("visualizer.wordcloud_cache_hits")
+            return self._images[key]
+        metrics.count("visualizer.wordcloud_cache_misses")
+
+        frequencies = self.frequencies(key)
+        if not frequencies:
+            return None
+        from wordcloud import WordCloud
+        wordcloud = WordCloud(width=self.width, height=self.height,
+                              background_color='white').generate_from_frequencies(frequencies)
+        fig = wordcloud_figure(wordcloud)
+        self._images[key] = fig
+        if len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+        return fig
 
+class SentimentVisualizer:
+    @metrics.timed("visualizer.create_wordcloud")
     def create_wordcloud(self, texts, sentiment_filter=None):
         """Generate word cloud from texts"""
-        plt.clf()  # Clear current figure
+        from wordcloud import WordCloud
         combined_text = ' '.join(texts)
         wordcloud = WordCloud(width=800, height=400,
                             background_color='white').generate(combined_text)
-        
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        fig = plt.gcf()
-        plt.close()  # Close the figure to free memory
-        return fig
+        return wordcloud_figure(wordcloud)
 
-    def plot_sentiment_trends(self, df):
+    @metrics.timed("visualizer.plot_sentiment_trends")
+    def plot_sentiment_trends(self, df, granularity='day'):
         """Plot sentiment trends over time"""
-        df['date'] = pd.to_datetime(df['date'])
-        daily_sentiments = df.groupby(['date', 'sentiment']).size().unstack(fill_value=0)
-        
+        rollup = SentimentRollup()
+        rollup.add(df[['date', 'sentiment']])
+        return self.plot_trend_table(rollup.trend_table(granularity), granularity)
+
+    @metrics.timed("visualizer.plot_trend_table")
+    def plot_trend_table(self, trend_table, granularity='day'):
+        """Plot sentiment trends from a rollup table (period x sentiment counts)"""
+        import plotly.graph_objects as go
         fig = go.Figure()
-        for sentiment in daily_sentiments.columns:
+        for sentiment in trend_table.columns:
             fig.add_trace(go.Scatter(
-                x=daily_sentiments.index,
-                y=daily_sentiments[sentiment],
+                x=trend_table.index,
+                y=trend_table[sentiment],
                 name=sentiment,
                 mode='lines+markers'
             ))
         
         fig.update_layout(
             title='Sentiment Trends Over Time',
-            xaxis_title='Date',
+            xaxis_title=f'Date ({granularity})',
             yaxis_title='Number of Reviews',
             hovermode='x unified'
         )
         return fig
 
+    @metrics.timed("visualizer.create_category_analysis")
     def create_category_analysis(self, df):
         """Create category-wise sentiment analysis"""
         if 'category' in df.columns:
-            cat_sentiment = pd.crosstab(df['category'], df['sentiment'])
-            fig = px.bar(cat_sentiment,
-                        title='Category-wise Sentiment Distribution',
-                        barmode='group')
-            return fig
+            return self.category_chart(pd.crosstab(df['category'], df['sentiment']))
         return None
 
+    @metrics.timed("visualizer.category_chart")
+    def category_chart(self, category_table):
+        """Create category-wise sentiment bars from a rollup table (category x sentiment counts)"""
+        import plotly.express as px
+        return px.bar(category_table,
+                      title='Category-wise Sentiment Distribution',
+                      barmode='group')
+
     def sentiment_distribution(self, df):
         """Create sentiment distribution pie chart"""
-        sentiment_counts = df['sentiment'].value_counts()
+        counts = df['sentiment'].value_counts()
+        # Categorical sentiment columns also count absent categories
+        return self.sentiment_distribution_from_counts(counts[counts > 0])
+
+    @metrics.timed("visualizer.sentiment_distribution")
+    def sentiment_distribution_from_counts(self, sentiment_counts):
+        """Create sentiment distribution pie chart from precomputed counts"""
+        import plotly.graph_objects as go
         colors = {'positive': 'green', 'negative': 'red', 'neutral': 'blue'}
         
         fig = go.Figure(data=[go.Pie(